@@ -103,7 +103,13 @@ class SpecialistAdmin(admin.ModelAdmin):
         "barber_shop",
     )
     search_fields = ("user__first_name", "user__last_name", "user__email", "bio")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = (
+        "average_rating",
+        "reviews_count",
+        "rating_sum",
+        "created_at",
+        "updated_at",
+    )
     inlines = [DayAvailabilityInline]
 
 
@@ -184,7 +190,13 @@ class BarberAdmin(admin.ModelAdmin):
     )
     list_filter = ("barber_shop", "created_at")
     search_fields = ("name", "barber_shop__name")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = (
+        "average_rating",
+        "reviews_count",
+        "rating_sum",
+        "created_at",
+        "updated_at",
+    )
 
 
 @admin.register(QnaQuestion)
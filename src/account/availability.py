@@ -0,0 +1,454 @@
+import datetime
+import math
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from hairstyle.availability import (
+    BLOCKING_STATUSES,
+    Schedule,
+    day_of_week,
+    get_weekly_windows,
+    merge,
+)
+from hairstyle.models.appointment import Appointment
+from hairstyle.models.service import Service
+
+from .models import DayAvailability, DayOff
+
+BUCKET_MINUTES = 5  # resolution of the bitmaps
+BUCKETS_PER_DAY = 24 * 60 // BUCKET_MINUTES
+CACHE_DURATION = (
+    60 * 60 * 24
+)  # rebuilt on changes; the timeout only drops past days off
+EARTH_RADIUS_KM = 6371.0
+STATUS_LOOKAHEAD_DAYS = 7  # days searched for a specialist's next free time
+
+
+def get_cache_key(specialist_id):
+    return f"weekly_availability_v2_{specialist_id}"
+
+
+def get_minute(value):
+    """Minutes since midnight of a time or datetime"""
+    return value.hour * 60 + value.minute
+
+
+def span(start_minute, end_minute, inner=False):
+    """
+    Bitmap of the buckets overlapped by [start_minute, end_minute) of a day,
+    or with `inner` only the buckets entirely inside it
+    """
+    if inner:
+        first = -(-start_minute // BUCKET_MINUTES)
+        last = end_minute // BUCKET_MINUTES
+    else:
+        first = start_minute // BUCKET_MINUTES
+        last = -(-end_minute // BUCKET_MINUTES)
+    first = max(first, 0)
+    last = min(last, BUCKETS_PER_DAY)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+class WeeklyAvailability:
+    """
+    # WeeklyAvailability
+    Availability of one specialist: the exact working windows of each weekday, and one
+    bitmap per weekday whose bit n is set when the BUCKET_MINUTES bucket starting
+    n * BUCKET_MINUTES minutes after midnight overlaps a window.
+
+    The bitmaps cover every working minute (windows round outward), so they can rule
+    specialists out; free times themselves come from the exact interval sweep of
+    hairstyle.availability over the windows (see get_schedule()), like the
+    specialist availability endpoint.
+
+    **Attributes**
+    - weekly: 7 bitmaps indexed by DayAvailability.day_of_week
+    - windows: 7 sorted, merged lists of (start_time, end_time) indexed the same way
+    - days_off: set of dates without availability, from the day the bitmaps were built
+    """
+
+    __slots__ = ("weekly", "windows", "days_off")
+
+    def __init__(self, windows=None, days_off=()):
+        self.windows = [merge(day) for day in windows or [[]] * 7]
+        self.weekly = []
+        for day in self.windows:
+            bitmap = 0
+            for start, end in day:
+                bitmap |= span(get_minute(start), get_minute(end))
+            self.weekly.append(bitmap)
+        self.days_off = set(days_off)
+
+    def get_day(self, date):
+        """Bitmap of `date`: its weekday, or nothing on a day off"""
+        if date in self.days_off:
+            return 0
+        return self.weekly[day_of_week(date)]
+
+    def get_schedule(self, busy=()):
+        """
+        hairstyle.availability.Schedule of the specialist, with the (start, end) aware
+        datetimes of its blocking appointments `busy`
+        """
+        schedule = Schedule()
+        schedule.weekly.update(enumerate(self.windows))
+        schedule.days_off = self.days_off
+        tz = timezone.get_current_timezone()
+        schedule.busy = merge(
+            (timezone.localtime(start, tz), timezone.localtime(end, tz))
+            for start, end in busy
+        )
+        return schedule
+
+    def __getstate__(self):
+        return self.windows, self.weekly, sorted(self.days_off)
+
+    def __setstate__(self, state):
+        self.windows, self.weekly, days_off = state
+        self.days_off = set(days_off)
+
+
+def get_bitmap(intervals, date, inner=False):
+    """
+    Bitmap of the buckets of `date` overlapped by the (start, end) aware datetimes
+    `intervals`, or with `inner` only the buckets entirely inside one of them
+    """
+    tz = timezone.get_current_timezone()
+    day_start = timezone.make_aware(
+        datetime.datetime.combine(date, datetime.time()), tz
+    )
+    bitmap = 0
+    for start, end in intervals:
+        start_minute = (start - day_start).total_seconds() / 60
+        end_minute = (end - day_start).total_seconds() / 60
+        if end_minute <= 0 or start_minute >= 24 * 60:
+            continue
+        # partial minutes round like partial buckets
+        if inner:
+            start_minute, end_minute = math.ceil(start_minute), math.floor(end_minute)
+        else:
+            start_minute, end_minute = math.floor(start_minute), math.ceil(end_minute)
+        bitmap |= span(max(start_minute, 0), min(end_minute, 24 * 60), inner=inner)
+    return bitmap
+
+
+def get_free_runs(bitmap, buckets):
+    """
+    (first bucket, end bucket) runs of at least `buckets` consecutive set bits in `bitmap`
+    """
+    runs = []
+    bucket = 0
+    while bitmap:
+        # skip to the next set bit, then measure the run of set bits
+        skip = (bitmap & -bitmap).bit_length() - 1
+        bitmap >>= skip
+        bucket += skip
+        length = (~bitmap & (bitmap + 1)).bit_length() - 1
+        if length >= buckets:
+            runs.append((bucket, bucket + length))
+        bitmap >>= length
+        bucket += length
+    return runs
+
+
+def build_weekly_availability(specialist_ids):
+    """
+    {specialist id: WeeklyAvailability} from the database: three queries
+    (day availabilities, their time slots, upcoming days off)
+    """
+    windows = defaultdict(lambda: [[] for _ in range(7)])
+    availabilities = DayAvailability.objects.filter(
+        specialist_id__in=specialist_ids
+    ).prefetch_related("time_slots")
+    for availability in availabilities:
+        windows[availability.specialist_id][availability.day_of_week].extend(
+            get_weekly_windows(availability)
+        )
+
+    days_off = defaultdict(set)
+    for specialist_id, date in DayOff.objects.filter(
+        specialist_id__in=specialist_ids, date__gte=timezone.localdate()
+    ).values_list("specialist_id", "date"):
+        days_off[specialist_id].add(date)
+
+    return {
+        specialist_id: WeeklyAvailability(
+            windows.get(specialist_id), days_off[specialist_id]
+        )
+        for specialist_id in specialist_ids
+    }
+
+
+def get_weekly_availability(specialist_ids):
+    """
+    {specialist id: WeeklyAvailability} from the cache, building the missing ones
+    together (one cache.get_many, and three queries when any is missing)
+    """
+    specialist_ids = list(dict.fromkeys(specialist_ids))
+    keys = {
+        get_cache_key(specialist_id): specialist_id for specialist_id in specialist_ids
+    }
+    cached = cache.get_many(list(keys))
+    found = {keys[key]: value for key, value in cached.items()}
+    missing = [
+        specialist_id for specialist_id in specialist_ids if specialist_id not in found
+    ]
+    if missing:
+        built = build_weekly_availability(missing)
+        cache.set_many(
+            {
+                get_cache_key(specialist_id): value
+                for specialist_id, value in built.items()
+            },
+            CACHE_DURATION,
+        )
+        found.update(built)
+    return found
+
+
+def invalidate_weekly_availability(specialist_id, using=None):
+    """
+    Drop the cached bitmaps of the specialist once the current transaction commits
+    (readers racing the transaction would otherwise cache the old rows again)
+    """
+    if specialist_id is not None:
+        transaction.on_commit(
+            lambda: cache.delete(get_cache_key(specialist_id)), using=using
+        )
+
+
+def get_availability_status(specialist_ids, now=None):
+    """
+    {specialist id: {"is_available", "next_available_at"}} for a page of specialists:
+    whether the current bucket is free (inside a free interval of the sweep that
+    find_free_intervals() runs), and otherwise when the next free bucket starts within
+    STATUS_LOOKAHEAD_DAYS (None without one).
+    Reads the cached weekly availability (three queries for the missing ones)
+    and the blocking appointments of every specialist in one query.
+    """
+    specialist_ids = list(dict.fromkeys(specialist_ids))
+    if not specialist_ids:
+        return {}
+    tz = timezone.get_current_timezone()
+    now = timezone.localtime(now, tz)
+    today = now.date()
+    current = get_minute(now) // BUCKET_MINUTES
+    dates = [
+        today + datetime.timedelta(days=days) for days in range(STATUS_LOOKAHEAD_DAYS)
+    ]
+    end = timezone.make_aware(
+        datetime.datetime.combine(
+            dates[-1] + datetime.timedelta(days=1), datetime.time()
+        ),
+        tz,
+    )
+
+    weekly = get_weekly_availability(specialist_ids)
+    busy = defaultdict(list)
+    for specialist_id, schedule, ends_at in Appointment.objects.filter(
+        service__specialist_id__in=specialist_ids,
+        status__in=BLOCKING_STATUSES,
+        schedule__lt=end,
+        ends_at__gt=now,
+    ).values_list("service__specialist_id", "schedule", "ends_at"):
+        busy[specialist_id].append((schedule, ends_at))
+
+    statuses = {}
+    for specialist_id in specialist_ids:
+        schedule = weekly[specialist_id].get_schedule(busy.get(specialist_id, ()))
+        intervals = schedule.free_intervals(
+            today, dates[-1], datetime.timedelta(minutes=BUCKET_MINUTES)
+        )
+        is_available = False
+        next_available_at = None
+        for date in dates:
+            # buckets entirely inside the free intervals
+            free = get_bitmap(intervals, date, inner=True)
+            if date == today:
+                is_available = bool(free >> current & 1)
+                if is_available:
+                    break
+                # buckets already past
+                free &= ~((1 << current) - 1)
+            if free:
+                bucket = (free & -free).bit_length() - 1
+                next_available_at = timezone.make_aware(
+                    datetime.datetime.combine(date, datetime.time())
+                    + datetime.timedelta(minutes=bucket * BUCKET_MINUTES),
+                    tz,
+                )
+                break
+        statuses[specialist_id] = {
+            "is_available": is_available,
+            "next_available_at": next_available_at,
+        }
+    return statuses
+
+
+def attach_availability_status(specialists, now=None):
+    """
+    Set `availability_status` (see get_availability_status()) on every specialist of a page
+    """
+    specialists = list(specialists)
+    statuses = get_availability_status(
+        [specialist.pk for specialist in specialists], now
+    )
+    for specialist in specialists:
+        specialist.availability_status = statuses[specialist.pk]
+
+
+def get_distance(latitude, longitude, other_latitude, other_longitude):
+    """Great-circle distance in kilometers"""
+    latitude, longitude, other_latitude, other_longitude = map(
+        math.radians, (latitude, longitude, other_latitude, other_longitude)
+    )
+    a = (
+        math.sin((other_latitude - latitude) / 2) ** 2
+        + math.cos(latitude)
+        * math.cos(other_latitude)
+        * math.sin((other_longitude - longitude) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def find_available_specialists(
+    start,
+    end,
+    duration_minutes=None,
+    label_id=None,
+    service_name=None,
+    location=None,
+    now=None,
+):
+    """
+    Specialists with at least one bookable slot inside [start, end) (aware datetimes),
+    as [{"specialist", "next_available", "distance"}] sorted by their first free slot.
+
+    A slot fits `duration_minutes`, or else the shortest of the specialist's services
+    matching `label_id` and `service_name` (specialists without one are left out).
+    `location` is (latitude, longitude, radius in kilometers).
+
+    Costs one query for the services, the cached weekly availability (three queries
+    for the missing ones) and one query for the appointments of the specialists
+    whose bitmaps leave room in the window, whatever their number. Their free times
+    then come from the interval sweep of find_free_intervals() over the cached windows.
+    """
+    now = timezone.now() if now is None else now
+    start = max(start, now)
+    if end <= start:
+        return []
+
+    services = Service.objects.all()
+    if label_id is not None:
+        services = services.filter(ServiceLabels__label_id=label_id)
+    if service_name:
+        services = services.filter(name__icontains=service_name)
+    if location is not None:
+        latitude, longitude, radius = location
+        # bounding box in SQL, exact distance below
+        delta_latitude = math.degrees(radius / EARTH_RADIUS_KM)
+        delta_longitude = delta_latitude / max(math.cos(math.radians(latitude)), 0.01)
+        services = services.filter(
+            specialist__latitude__range=(
+                latitude - delta_latitude,
+                latitude + delta_latitude,
+            ),
+            specialist__longitude__range=(
+                longitude - delta_longitude,
+                longitude + delta_longitude,
+            ),
+        )
+
+    candidates = {}
+    for (
+        specialist_id,
+        minutes,
+        specialist_latitude,
+        specialist_longitude,
+    ) in services.values_list(
+        "specialist_id",
+        "duration_minutes",
+        "specialist__latitude",
+        "specialist__longitude",
+    ):
+        if specialist_id not in candidates:
+            distance = None
+            if location is not None:
+                distance = get_distance(
+                    latitude, longitude, specialist_latitude, specialist_longitude
+                )
+                if distance > radius:
+                    continue
+            candidates[specialist_id] = [minutes, distance]
+        elif minutes < candidates[specialist_id][0]:
+            candidates[specialist_id][0] = minutes
+    if duration_minutes is not None:
+        for candidate in candidates.values():
+            candidate[0] = duration_minutes
+
+    tz = timezone.get_current_timezone()
+    first_date = timezone.localtime(start, tz).date()
+    last_date = timezone.localtime(end, tz).date()
+    dates = []
+    date = first_date
+    while date <= last_date:
+        # every bucket the window reaches, so that no free time is ruled out
+        dates.append((date, get_bitmap([(start, end)], date)))
+        date += datetime.timedelta(days=1)
+
+    # availability alone rules most specialists out before any appointment is read
+    weekly = get_weekly_availability(candidates)
+    possible = []
+    for specialist_id, (minutes, _) in candidates.items():
+        buckets = max(-(-minutes // BUCKET_MINUTES), 1)
+        availability = weekly[specialist_id]
+        if any(
+            get_free_runs(availability.get_day(date) & window, buckets)
+            for date, window in dates
+        ):
+            possible.append(specialist_id)
+    if not possible:
+        return []
+
+    busy = defaultdict(list)
+    appointments = Appointment.objects.filter(
+        service__specialist_id__in=possible,
+        status__in=BLOCKING_STATUSES,
+        schedule__lt=end,
+        ends_at__gt=start,
+    ).values_list("service__specialist_id", "schedule", "ends_at")
+    for specialist_id, schedule, ends_at in appointments:
+        busy[specialist_id].append((schedule, ends_at))
+
+    found = []
+    for specialist_id in possible:
+        minutes, distance = candidates[specialist_id]
+        duration = datetime.timedelta(minutes=max(minutes, 1))
+        # the exact sweep of find_free_intervals(), so both agree to the minute
+        schedule = weekly[specialist_id].get_schedule(busy.get(specialist_id, ()))
+        for interval_start, interval_end in schedule.free_intervals(
+            first_date, last_date, duration, start
+        ):
+            if interval_start + duration > min(interval_end, end):
+                continue
+            found.append(
+                {
+                    "specialist": specialist_id,
+                    "next_available": interval_start,
+                    "distance": (distance if distance is None else round(distance, 2)),
+                }
+            )
+            break
+    found.sort(
+        key=lambda row: (
+            row["next_available"],
+            row["distance"] or 0,
+            row["specialist"],
+        )
+    )
+    return found
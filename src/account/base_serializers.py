@@ -12,7 +12,7 @@ from account.models import (
     AppointmentTimeSlot,
     QnaAnswer,
     QnaQuestion,
-    UserNotification
+    UserNotification,
 )
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
@@ -25,7 +25,8 @@ class BarberBaseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Barber
-        fields = "__all__"
+        # rating_sum only backs average_rating
+        exclude = ["rating_sum"]
 
 
 class BarberShopBaseSerializer(serializers.ModelSerializer):
@@ -58,7 +59,13 @@ class CustomerBaseSerializer(serializers.ModelSerializer):
 
 
 class SpecialistBaseSerializer(serializers.ModelSerializer):
-    is_available = serializers.BooleanField(read_only=True)
+    # set for a whole page by account.availability.attach_availability_status()
+    is_available = serializers.BooleanField(
+        source="availability_status.is_available", read_only=True, default=None
+    )
+    next_available_at = serializers.DateTimeField(
+        source="availability_status.next_available_at", read_only=True, default=None
+    )
     user_id = serializers.IntegerField(write_only=True)
     barber_shop_id = serializers.IntegerField(write_only=True, required=False)
     average_rating = serializers.FloatField(read_only=True)
@@ -66,7 +73,8 @@ class SpecialistBaseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Specialist
-        fields = "__all__"
+        # rating_sum only backs average_rating
+        exclude = ["rating_sum"]
 
 
 class UserBaseSerializer(serializers.ModelSerializer):
@@ -172,6 +180,7 @@ class SpecialistShopImageBaseSerializer(serializers.ModelSerializer):
 
 class UserNotificationBaseSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(write_only=True)
+
     class Meta:
         model = UserNotification
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
@@ -2,6 +2,8 @@ from django.utils.functional import SimpleLazyObject
 from django.contrib.auth.middleware import get_user
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from haircat.utils.instrumentation import timer
+
 
 def get_user_jwt(request):
     user = None
@@ -27,7 +29,8 @@ class JWTAuthMiddleware:
         if not hasattr(request, "_cached_user"):
             request._cached_user = get_user(request)
             if request._cached_user.is_anonymous:
-                jwt_user = get_user_jwt(request)
+                with timer("auth"):
+                    jwt_user = get_user_jwt(request)
                 if jwt_user is not None:
                     request._cached_user = jwt_user
         return request._cached_user
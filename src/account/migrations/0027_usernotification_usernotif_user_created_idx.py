@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0026_usernotification_redirect_id_usernotification_type"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="usernotification",
+            index=models.Index(
+                fields=["user", "created_at", "id"], name="usernotif_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0027_usernotification_usernotif_user_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="barber",
+            name="average_rating",
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="barber",
+            name="rating_sum",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="barber",
+            name="reviews_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="specialist",
+            name="average_rating",
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="specialist",
+            name="rating_sum",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="specialist",
+            name="reviews_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
@@ -95,21 +95,14 @@ class Barber(models.Model):
         on_delete=models.SET_NULL,
         related_name="barber_pfps",
     )
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def average_rating(self):
-        reviews = self.Appointments.exclude(review__isnull=True).values_list(
-            "review__rating", flat=True
-        )
-        if not reviews:
-            return 0
-        return round(sum(reviews) / len(reviews), 1)
+    # review counters, kept up to date by hairstyle.counters
+    rating_sum = models.IntegerField(default=0, editable=False)
+    reviews_count = models.IntegerField(default=0, editable=False)
+    average_rating = models.FloatField(default=0, editable=False, db_index=True)
 
-    @property
-    def reviews_count(self):
-        return self.Appointments.exclude(review__isnull=True).count()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.barber_shop.name} - {self.name}"
@@ -140,17 +133,15 @@ class Specialist(models.Model):
     latitude = models.FloatField(
         null=True,
         blank=True,
-        help_text="Latitude coordinate of the specialist's location"
+        help_text="Latitude coordinate of the specialist's location",
     )
     longitude = models.FloatField(
         null=True,
         blank=True,
-        help_text="Longitude coordinate of the specialist's location"
+        help_text="Longitude coordinate of the specialist's location",
     )
     address = models.TextField(
-        null=True,
-        blank=True,
-        help_text="Full address of the specialist's location"
+        null=True, blank=True, help_text="Full address of the specialist's location"
     )
     google_maps_link = models.URLField(
         blank=True,
@@ -170,34 +161,22 @@ class Specialist(models.Model):
         help_text="If the specialist should automatically accept appointments",
     )
 
+    # review counters, kept up to date by hairstyle.counters
+    rating_sum = models.IntegerField(default=0, editable=False)
+    reviews_count = models.IntegerField(default=0, editable=False)
+    average_rating = models.FloatField(default=0, editable=False, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def average_rating(self):
-        from hairstyle.models.appointment import Review
-
-        reviews = Review.objects.filter(
-            appointment__service__specialist=self
-        ).values_list("rating", flat=True)
-        if not reviews:
-            return 0
-        return round(sum(reviews) / len(reviews), 1)
-
-    @property
-    def reviews_count(self):
-        from hairstyle.models.appointment import Review
-
-        return Review.objects.filter(appointment__service__specialist=self).count()
-
     def is_available(self, date, time):
         """Check if specialist is available at given date/time"""
         # Skip if day off
         if self.days_off.filter(date=date).exists():
             return False
 
-        # Check regular availability
-        weekday = date.weekday()
+        # Check regular availability (day_of_week 0 is Sunday)
+        weekday = date.isoweekday() % 7
         return self.availabilities.filter(
             day_of_week=weekday, start_time__lte=time, end_time__gt=time
         ).exists()
@@ -113,15 +113,17 @@ class UserNotification(models.Model):
     MESSAGE_TYPE = "message"
     REVIEW_TYPE = "review"
     OTHER_TYPE = "other"
-    
+
     TYPE_CHOICES = [
         (APPOINTMENT_TYPE, "Appointment"),
         (MESSAGE_TYPE, "Message"),
         (REVIEW_TYPE, "Review"),
         (OTHER_TYPE, "Other"),
     ]
-    
-    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="notifications")
+
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name="notifications"
+    )
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -129,5 +131,14 @@ class UserNotification(models.Model):
     type = models.CharField(max_length=20, choices=TYPE_CHOICES, default="other")
     redirect_id = models.IntegerField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination over a user's notifications
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="usernotif_user_created_idx",
+            ),
+        ]
+
     def __str__(self):
-        return f"{self.user.full_name} - {self.message}"
\ No newline at end of file
+        return f"{self.user.full_name} - {self.message}"
@@ -38,5 +38,28 @@ class Customer(models.Model):
             status__in=[Appointment.CONFIRMED, Appointment.PENDING],
         ).exists()
 
+    @staticmethod
+    def total_points_annotation():
+        """total_points as a query expression"""
+        from haircat.utils.annotations import aggregate_subquery
+        from .barber import RewardPoints
+
+        return aggregate_subquery(
+            RewardPoints.objects, "customer", models.Sum("points")
+        )
+
+    @staticmethod
+    def has_active_appointment_annotation():
+        """has_active_appointment as a query expression, evaluated at query time"""
+        from hairstyle.models.appointment import Appointment
+
+        return models.Exists(
+            Appointment.objects.filter(
+                customer=models.OuterRef("pk"),
+                schedule__gte=timezone.now(),
+                status__in=[Appointment.CONFIRMED, Appointment.PENDING],
+            )
+        )
+
     def __str__(self):
         return f"Customer - {self.user.full_name}"
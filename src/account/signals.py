@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from general.webhooks import send_webhook
+from .availability import invalidate_weekly_availability
+from .models.barber import AppointmentTimeSlot, DayAvailability, DayOff
 from .models.custom_user import UserNotification
+from .views import UserNotificationView
 
 
 @receiver(post_save, sender=UserNotification)
@@ -9,14 +12,44 @@ def notification_webhook_handler(sender, instance, created, **kwargs):
     """
     Send webhook notification when a new user notification is created.
     """
+    UserNotificationView.invalidate_cache_scopes(
+        [UserNotificationView.get_user_scope(instance.user_id)]
+    )
     if created:
         send_webhook(
-            event_name='new_notif',
+            event_name="new_notif",
             user_id=instance.user.id,
             data={
-                'id': instance.id,
-                'message': instance.message,
-                'is_read': instance.is_read,
-                'created_at': instance.created_at.isoformat()
-            }
-        ) 
\ No newline at end of file
+                "id": instance.id,
+                "message": instance.message,
+                "is_read": instance.is_read,
+                "created_at": instance.created_at.isoformat(),
+            },
+        )
+
+
+@receiver(post_save, sender=DayAvailability)
+@receiver(post_delete, sender=DayAvailability)
+@receiver(post_save, sender=DayOff)
+@receiver(post_delete, sender=DayOff)
+def weekly_availability_handler(sender, instance, using=None, **kwargs):
+    """
+    Rebuild the specialist's availability bitmaps after their availability or days off change.
+    """
+    invalidate_weekly_availability(instance.specialist_id, using)
+
+
+@receiver(post_save, sender=AppointmentTimeSlot)
+@receiver(pre_delete, sender=AppointmentTimeSlot)
+def time_slot_availability_handler(sender, instance, using=None, **kwargs):
+    """
+    Rebuild the specialist's availability bitmaps after a time slot changes
+    (before deletion, while its day availability can still be read).
+    """
+    specialist_id = (
+        DayAvailability.objects.using(using)
+        .filter(pk=instance.day_availability_id)
+        .values_list("specialist_id", flat=True)
+        .first()
+    )
+    invalidate_weekly_availability(specialist_id, using)
@@ -1,3 +1,445 @@
+import datetime
+import json
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from account.availability import (
+    find_available_specialists,
+    get_availability_status,
+    get_weekly_availability,
+)
+from account.models import (
+    AppointmentTimeSlot,
+    Barber,
+    BarberShop,
+    DayAvailability,
+    DayOff,
+    UserNotification,
+)
+from account.views import DayOffView, SpecialistView, UserNotificationView, UserView
+from haircat.testing import (
+    FastReadTestMixin,
+    QueryCountMixin,
+    call_view,
+    create_appointment,
+    create_customer,
+    create_service,
+    create_specialist,
+    create_user,
+)
+from haircat.utils.caching import get_generation
+from hairstyle.availability import day_of_week, find_free_intervals
 
 # Create your tests here.
+
+
+class FastReadTest(FastReadTestMixin, TestCase):
+    FIELDSETS = {
+        UserNotificationView: [
+            "id,message,created_at,updated_at,is_read,type,redirect_id",
+            "id,user.id,user.first_name,user.username,user.email,user.date_joined,"
+            "user.phone_number",
+        ],
+    }
+
+    def setUp(self):
+        for index in range(2):
+            user = create_user(phone_number="09171234567" if index else None)
+            UserNotification.objects.create(
+                user=user, message="Booked", type=UserNotification.APPOINTMENT_TYPE
+            )
+            UserNotification.objects.create(
+                user=user, message="Hello", is_read=True, redirect_id=index
+            )
+
+
+class QueryCountTest(QueryCountMixin, TestCase):
+    def setUp(self):
+        for index in range(3):
+            create_customer()
+            create_specialist(
+                barber_shop=(
+                    BarberShop.objects.create(name=f"Shop {index}") if index else None
+                )
+            )
+        self.user = create_user()
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        self.assertFlatQueries(UserView, self.user)
+        self.assertFlatQueries(
+            UserView,
+            self.user,
+            "fields=id,pfp_url,is_specialist,is_barber_shop,is_customer",
+        )
+
+
+class DurationParamTest(TestCase):
+    def setUp(self):
+        self.specialist = create_specialist()
+
+    def request(self, action, query, **kwargs):
+        return call_view(
+            SpecialistView, {"get": action}, self.specialist.user, query, **kwargs
+        )
+
+    def test_duration_must_be_a_positive_integer(self):
+        search = "start=2030-01-07T09:00&end=2030-01-07T18:00&"
+        for value in ("0", "-30", "abc", "1.5"):
+            for action, query, kwargs in (
+                ("availability", "", {"pk": self.specialist.pk}),
+                ("search", search, {}),
+            ):
+                with self.subTest(action=action, duration_minutes=value):
+                    response = self.request(
+                        action, f"{query}duration_minutes={value}", **kwargs
+                    )
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(
+                        response.data,
+                        {"error": "duration_minutes must be a positive integer"},
+                    )
+        response = self.request(
+            "availability", "duration_minutes=30", pk=self.specialist.pk
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.request("search", f"{search}duration_minutes=30").status_code, 200
+        )
+
+
+class AvailabilityEngineTest(TestCase):
+    """
+    The search and the list statuses (cached weekly bitmaps) agree with the
+    availability endpoint (interval sweep) on a day whose times are not bucket aligned
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.day = timezone.localdate() + datetime.timedelta(days=7)
+        self.specialist = create_specialist()
+        availability = DayAvailability.objects.create(
+            specialist=self.specialist,
+            day_of_week=day_of_week(self.day),
+            start_time=datetime.time(9),
+            end_time=datetime.time(18),
+        )
+        for start, end, is_available in (
+            ((9, 3), (12, 0), True),
+            ((12, 0), (13, 0), False),
+            ((13, 0), (17, 58), True),
+        ):
+            AppointmentTimeSlot.objects.create(
+                day_availability=availability,
+                start_time=datetime.time(*start),
+                end_time=datetime.time(*end),
+                is_available=is_available,
+            )
+        create_appointment(
+            create_service(self.specialist, duration_minutes=45),
+            schedule=self.at(9, 32),
+        )
+        create_appointment(
+            create_service(self.specialist, duration_minutes=30),
+            schedule=self.at(14, 1),
+        )
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(
+            datetime.datetime.combine(self.day, datetime.time(hour, minute))
+        )
+
+    def search(self, start, end, minutes):
+        results = find_available_specialists(start, end, minutes, now=self.at(0))
+        return results[0]["next_available"] if results else None
+
+    def test_engines_agree(self):
+        free = find_free_intervals(
+            [self.specialist.pk], self.day, self.day, 1, now=self.at(0)
+        )[self.specialist.pk]
+        self.assertEqual(
+            free,
+            [
+                (self.at(9, 3), self.at(9, 32)),
+                (self.at(10, 17), self.at(12)),
+                (self.at(13), self.at(14, 1)),
+                (self.at(14, 31), self.at(17, 58)),
+            ],
+        )
+
+        for start, end, minutes, expected in (
+            (self.at(0), self.at(23), 29, self.at(9, 3)),
+            (self.at(0), self.at(23), 30, self.at(10, 17)),
+            (self.at(0), self.at(23), 105, self.at(14, 31)),
+            (self.at(0), self.at(23), 210, None),
+            (self.at(11), self.at(13, 30), 45, self.at(11)),
+            (self.at(11), self.at(13, 30), 61, None),
+        ):
+            with self.subTest(start=start, end=end, minutes=minutes):
+                self.assertEqual(self.search(start, end, minutes), expected)
+                intervals = find_free_intervals(
+                    [self.specialist.pk], self.day, self.day, minutes, now=start
+                )[self.specialist.pk]
+                fits = [
+                    interval_start
+                    for interval_start, interval_end in intervals
+                    if interval_start + datetime.timedelta(minutes=minutes)
+                    <= min(interval_end, end)
+                ]
+                self.assertEqual(fits[0] if fits else None, expected)
+
+        # statuses answer per 5 minute bucket, entirely inside a free interval
+        for now, is_available, next_available_at in (
+            (self.at(9, 10), True, None),
+            (self.at(9, 31), False, self.at(10, 20)),
+            (self.at(12, 30), False, self.at(13)),
+            (self.at(17, 56), False, None),
+        ):
+            with self.subTest(now=now):
+                self.assertEqual(
+                    get_availability_status([self.specialist.pk], now)[
+                        self.specialist.pk
+                    ],
+                    {
+                        "is_available": is_available,
+                        "next_available_at": next_available_at,
+                    },
+                )
+
+
+class NotificationReadTest(TestCase):
+    """Listing notifications marks only the ones the response shows as read"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user()
+        now = timezone.now()
+        self.notifications = []
+        for index in range(UserNotificationView.size_per_request + 5):
+            notification = UserNotification.objects.create(
+                user=self.user, message=f"Hello {index}"
+            )
+            # listed newest first
+            UserNotification.objects.filter(pk=notification.pk).update(
+                created_at=now - datetime.timedelta(minutes=index)
+            )
+            self.notifications.append(notification)
+
+    def list(self, query):
+        response = call_view(UserNotificationView, {"get": "list"}, self.user, query)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def unread(self):
+        return set(
+            UserNotification.objects.filter(is_read=False).values_list("pk", flat=True)
+        )
+
+    def pks(self, notifications):
+        return {notification.pk for notification in notifications}
+
+    def test_only_listed_notifications_are_read(self):
+        self.list("top=0&bottom=2")
+        self.assertEqual(self.unread(), self.pks(self.notifications[2:]))
+
+        # batch retrieves do not mark anything
+        ids = ",".join(str(pk) for pk in self.pks(self.notifications[2:4]))
+        self.list(f"ids={ids}")
+        self.assertEqual(self.unread(), self.pks(self.notifications[2:]))
+
+        # the first cursor page leaves the next pages unread
+        page = json.loads(self.list("cursor=").content)
+        self.assertTrue(page["next"])
+        size = UserNotificationView.size_per_request
+        self.assertEqual(self.unread(), self.pks(self.notifications[size:]))
+        self.list(f"cursor={page['next']}")
+        self.assertEqual(self.unread(), set())
+
+
+class NotificationScopeTest(TestCase):
+    """A user's notification only evicts that user's cached lists"""
+
+    def setUp(self):
+        cache.clear()
+        self.users = [create_user(), create_user()]
+        for user in self.users:
+            # read already, so listing does not write
+            UserNotification.objects.create(user=user, message="Hello", is_read=True)
+
+    def list(self, user):
+        response = call_view(UserNotificationView, {"get": "list"}, user)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def generation(self, user):
+        return get_generation(
+            UserNotificationView.get_list_generation_key(
+                UserNotificationView.get_user_scope(user.pk)
+            )
+        )
+
+    def test_write_bumps_only_the_owner_scope(self):
+        first, second = self.users
+        self.assertEqual(self.list(first)["total_count"], 1)
+        self.assertEqual(self.list(second)["total_count"], 1)
+        generations = [self.generation(user) for user in self.users]
+        global_generation = get_generation(
+            UserNotificationView.get_list_generation_key()
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserNotification.objects.create(user=second, message="Booked", is_read=True)
+
+        self.assertEqual(self.generation(first), generations[0])
+        self.assertNotEqual(self.generation(second), generations[1])
+        self.assertEqual(
+            get_generation(UserNotificationView.get_list_generation_key()),
+            global_generation,
+        )
+        self.assertEqual(self.list(first)["total_count"], 1)
+        self.assertEqual(self.list(second)["total_count"], 2)
+
+
+class BulkTest(TestCase):
+    def setUp(self):
+        self.specialist = create_specialist()
+        self.day = timezone.localdate() + datetime.timedelta(days=7)
+
+    def request(self, action, method, data=None):
+        return call_view(
+            DayOffView, {method: action}, self.specialist.user, "", method, data
+        )
+
+    def items(self, count):
+        return [
+            {
+                "specialist_id": self.specialist.pk,
+                "date": str(self.day + datetime.timedelta(days=index)),
+                "type": DayOff.VACATION,
+            }
+            for index in range(count)
+        ]
+
+    def test_bulk_create_update_and_delete(self):
+        response = self.request("bulk_create", "post", self.items(2))
+        self.assertEqual(response.status_code, 201)
+        pks = [item["id"] for item in response.data]
+        self.assertEqual(DayOff.objects.filter(pk__in=pks).count(), 2)
+
+        response = self.request(
+            "bulk_update", "put", [{"id": pk, "type": DayOff.SICK} for pk in pks]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["type_display"] for item in response.data], ["Sick Leave"] * 2
+        )
+        self.assertEqual(
+            set(DayOff.objects.values_list("type", flat=True)), {DayOff.SICK}
+        )
+
+        response = self.request("bulk_destroy", "delete", {"ids": pks})
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(DayOff.objects.exists())
+
+    def test_invalid_items_write_nothing(self):
+        items = self.items(2)
+        del items[1]["date"]
+        self.assertEqual(self.request("bulk_create", "post", items).status_code, 400)
+        self.assertEqual(self.request("bulk_create", "post", {}).status_code, 400)
+        self.assertFalse(DayOff.objects.exists())
+
+        day_off = DayOff.objects.create(
+            specialist=self.specialist, date=self.day, type=DayOff.OTHER
+        )
+        response = self.request(
+            "bulk_update", "put", [{"id": day_off.pk, "type": DayOff.SICK}, {"id": 0}]
+        )
+        self.assertEqual(response.status_code, 400)
+        day_off.refresh_from_db()
+        self.assertEqual(day_off.type, DayOff.OTHER)
+
+        response = self.request("bulk_destroy", "delete", {"ids": [day_off.pk, 0]})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["ids"], [0])
+        self.assertTrue(DayOff.objects.exists())
+
+
+class AvailabilityEndpointTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.day = timezone.localdate() + datetime.timedelta(days=7)
+        shop = BarberShop.objects.create(name="Shop")
+        self.barbers = [
+            Barber.objects.create(barber_shop=shop, name=name) for name in ("A", "B")
+        ]
+        self.specialist = create_specialist(barber_shop=shop)
+        availability = DayAvailability.objects.create(
+            specialist=self.specialist,
+            day_of_week=day_of_week(self.day),
+            start_time=datetime.time(9),
+            end_time=datetime.time(12),
+        )
+        AppointmentTimeSlot.objects.create(
+            day_availability=availability,
+            start_time=datetime.time(9),
+            end_time=datetime.time(12),
+            is_available=True,
+        )
+        create_appointment(
+            create_service(self.specialist, duration_minutes=30),
+            schedule=self.at(10),
+            barber=self.barbers[0],
+        )
+
+    def at(self, hour, minute=0):
+        return timezone.make_aware(
+            datetime.datetime.combine(self.day, datetime.time(hour, minute))
+        )
+
+    def request(self, query):
+        return call_view(
+            SpecialistView,
+            {"get": "availability"},
+            self.specialist.user,
+            query,
+            pk=self.specialist.pk,
+        )
+
+    def intervals(self, query=""):
+        response = self.request(
+            f"start={self.day}&end={self.day}&duration_minutes=30{query}"
+        )
+        self.assertEqual(response.status_code, 200)
+        return [
+            (interval["start"], interval["end"])
+            for interval in response.data["intervals"]
+        ]
+
+    def test_intervals(self):
+        busy = [(self.at(9), self.at(10)), (self.at(10, 30), self.at(12))]
+        self.assertEqual(self.intervals(), busy)
+        self.assertEqual(self.intervals(f"&barber={self.barbers[0].pk}"), busy)
+        # another barber of the shop is free while the first one works
+        self.assertEqual(
+            self.intervals(f"&barber={self.barbers[1].pk}"), [(self.at(9), self.at(12))]
+        )
+
+    def test_invalid_range(self):
+        response = self.request(
+            f"start={self.day}&end={self.day - datetime.timedelta(days=1)}"
+            "&duration_minutes=30"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "end must not be before start"})
+
+    def test_day_off_rebuilds_weekly_availability(self):
+        weekly = get_weekly_availability([self.specialist.pk])[self.specialist.pk]
+        self.assertTrue(weekly.get_day(self.day))
+        with self.captureOnCommitCallbacks(execute=True):
+            DayOff.objects.create(
+                specialist=self.specialist, date=self.day, type=DayOff.PERSONAL
+            )
+        weekly = get_weekly_availability([self.specialist.pk])[self.specialist.pk]
+        self.assertEqual(weekly.get_day(self.day), 0)
+        self.assertEqual(self.intervals(), [])
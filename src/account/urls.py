@@ -18,7 +18,7 @@ from .views import (
     QnaAnswerView,
     QnaQuestionView,
     ChangePasswordView,
-    UserNotificationView
+    UserNotificationView,
 )
 from .throttling import UserLoginRateThrottle
 from rest_framework.throttling import AnonRateThrottle
@@ -69,6 +69,11 @@ urlpatterns = [
         SpecialistView.as_view({"get": "list", "post": "create"}),
         name="specialist-list",
     ),
+    path(
+        "specialists/search/",
+        SpecialistView.as_view({"get": "search"}),
+        name="specialist-search",
+    ),
     path(
         "specialists/<int:pk>/",
         SpecialistView.as_view(
@@ -76,11 +81,23 @@ urlpatterns = [
         ),
         name="specialist-detail",
     ),
+    path(
+        "specialists/<int:pk>/availability/",
+        SpecialistView.as_view({"get": "availability"}),
+        name="specialist-availability",
+    ),
     path(
         "day-availabilities/",
         DayAvailabilityView.as_view({"get": "list", "post": "create"}),
         name="day-availability-list",
     ),
+    path(
+        "day-availabilities/bulk/",
+        DayAvailabilityView.as_view(
+            {"post": "bulk_create", "put": "bulk_update", "delete": "bulk_destroy"}
+        ),
+        name="day-availability-bulk",
+    ),
     path(
         "day-availabilities/<int:pk>/",
         DayAvailabilityView.as_view(
@@ -93,6 +110,13 @@ urlpatterns = [
         DayOffView.as_view({"get": "list", "post": "create"}),
         name="day-off-list",
     ),
+    path(
+        "day-offs/bulk/",
+        DayOffView.as_view(
+            {"post": "bulk_create", "put": "bulk_update", "delete": "bulk_destroy"}
+        ),
+        name="day-off-bulk",
+    ),
     path(
         "day-offs/<int:pk>/",
         DayOffView.as_view({"get": "retrieve", "put": "update", "delete": "destroy"}),
@@ -135,6 +159,13 @@ urlpatterns = [
         AppointmentTimeSlotView.as_view({"get": "list", "post": "create"}),
         name="appointment-time-slot-list",
     ),
+    path(
+        "appointment-time-slots/bulk/",
+        AppointmentTimeSlotView.as_view(
+            {"post": "bulk_create", "put": "bulk_update", "delete": "bulk_destroy"}
+        ),
+        name="appointment-time-slot-bulk",
+    ),
     path(
         "appointment-time-slots/<int:pk>/",
         AppointmentTimeSlotView.as_view(
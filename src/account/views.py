@@ -1,15 +1,24 @@
+import datetime
+
 from rest_framework import status, generics, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.permissions import AllowAny, IsAuthenticated as DRFIsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
 
 from haircat.permissions import IsAuthenticated
 from haircat.utils import GenericView
+from haircat.utils.annotations import has_annotated_field
 
+from .availability import (
+    BUCKET_MINUTES,
+    attach_availability_status,
+    find_available_specialists,
+)
 from .base_serializers import CustomTokenObtainPairSerializer, UserBaseSerializer
 from .serializers import (
     UserSerializer,
@@ -25,7 +34,7 @@ from .serializers import (
     QnaQuestionSerializer,
     ChangePasswordSerializer,
     SpecialistShopImageSerializer,
-    UserNotificationSerializer
+    UserNotificationSerializer,
 )
 from .models import (
     CustomUser,
@@ -40,7 +49,7 @@ from .models import (
     AppointmentTimeSlot,
     QnaAnswer,
     QnaQuestion,
-    UserNotification
+    UserNotification,
 )
 
 
@@ -49,12 +58,16 @@ class ChangePasswordView(APIView):
     serializer_class = ChangePasswordSerializer
 
     def post(self, request):
-        serializer = self.serializer_class(data=request.data, context={'request': request})
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
         if serializer.is_valid():
             user = request.user
-            user.set_password(serializer.validated_data['new_password'])
+            user.set_password(serializer.validated_data["new_password"])
             user.save()
-            return Response({"detail": "Password changed successfully"}, status=status.HTTP_200_OK)
+            return Response(
+                {"detail": "Password changed successfully"}, status=status.HTTP_200_OK
+            )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -99,18 +112,37 @@ class UserView(GenericView):
     permission_classes = [DRFIsAuthenticated]
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
+    # the role flags and `pfp_url` are model properties
+    select_related_fields = {
+        "is_specialist": ["specialist__barber_shop"],
+        "is_barber_shop": ["specialist__barber_shop"],
+        "is_customer": ["customer"],
+        "pfp_url": ["pfp"],
+    }
+    annotations = {
+        "customer.total_points": Customer.total_points_annotation(),
+        "customer.has_active_appointment": Customer.has_active_appointment_annotation,
+    }
 
 
 class CustomerView(GenericView):
     permission_classes = [DRFIsAuthenticated]
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    annotations = {
+        "total_points": Customer.total_points_annotation(),
+        "has_active_appointment": Customer.has_active_appointment_annotation,
+        # user.customer is the listed customer again
+        "user.customer.total_points": Customer.total_points_annotation(),
+        "user.customer.has_active_appointment": Customer.has_active_appointment_annotation,
+    }
 
     @action(detail=False, methods=["get"])
     def my_favorites(self, request):
         """Get all favorite specialists of the current user"""
         customer = request.user.customer
-        favorites = customer.favorite_specialists.all()
+        favorites = list(customer.favorite_specialists.all())
+        attach_availability_status(favorites)
         serializer = SpecialistSerializer(favorites, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -154,6 +186,27 @@ class SpecialistView(GenericView):
     permission_classes = [AllowAny]  # Allow registration without authentication
     queryset = Specialist.objects.all()
     serializer_class = SpecialistSerializer
+    conditional_requests = True
+    cache_key_prefix = "specialist"
+    cache_duration = 60 * 60 * 24  # invalidated through cache dependencies
+    stale_while_revalidate = 60
+    local_cache_duration = 5
+    # availability statuses hold for one availability bucket
+    # (and has_active_appointment turns false when an appointment starts)
+    cache_period = BUCKET_MINUTES * 60
+    # read by the availability statuses
+    cache_dependencies = [
+        "availabilities__time_slots",
+        "days_off",
+        "Services__Appointments",
+        # read by user.customer.total_points and has_active_appointment
+        "user__customer__reward_points",
+        "user__customer__Appointments",
+    ]
+    annotations = {
+        "user.customer.total_points": Customer.total_points_annotation(),
+        "user.customer.has_active_appointment": Customer.has_active_appointment_annotation,
+    }
 
     # Override specific methods to control permissions
     def get_permissions(self):
@@ -162,17 +215,184 @@ class SpecialistView(GenericView):
             return [AllowAny()]
         return [DRFIsAuthenticated()]
 
+    def serialize(self, data, many=False):
+        serializer = self.get_serializer()
+        if any(
+            has_annotated_field(serializer, name)
+            for name in ("is_available", "next_available_at")
+        ):
+            attach_availability_status(data if many else [data])
+        return super().serialize(data, many)
+
+    @action(detail=True, methods=["get"])
+    def availability(self, request, pk=None):
+        """
+        Bookable intervals of the specialist from `start` through `end` (dates, default: the next
+        two weeks) for appointments of `duration_minutes`, or of the duration of `service`.
+        Any start from an interval's start up to its end minus the duration is free.
+        """
+        from hairstyle.availability import MAX_RANGE_DAYS, find_free_intervals
+        from hairstyle.models.service import Service
+
+        specialist = get_object_or_404(Specialist, pk=pk)
+        params = request.query_params
+        try:
+            start = (
+                datetime.date.fromisoformat(params["start"])
+                if params.get("start")
+                else timezone.localdate()
+            )
+            end = (
+                datetime.date.fromisoformat(params["end"])
+                if params.get("end")
+                else start + datetime.timedelta(days=13)
+            )
+            barber_id = int(params["barber"]) if params.get("barber") else None
+            if params.get("service"):
+                service = Service.objects.filter(
+                    pk=int(params["service"]), specialist=specialist
+                ).first()
+                if service is None:
+                    return Response(
+                        {"error": "Service not found"}, status=status.HTTP_404_NOT_FOUND
+                    )
+                duration_minutes = service.duration_minutes
+            else:
+                duration_minutes = self.parse_duration(params["duration_minutes"])
+        except KeyError:
+            return Response(
+                {"error": "duration_minutes or service is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if end < start:
+            return Response(
+                {"error": "end must not be before start"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if (end - start).days >= MAX_RANGE_DAYS:
+            return Response(
+                {"error": f"At most {MAX_RANGE_DAYS} days per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        intervals = find_free_intervals(
+            [specialist.pk], start, end, duration_minutes, barber_id
+        )[specialist.pk]
+        return Response(
+            {
+                "specialist": specialist.pk,
+                "start": start,
+                "end": end,
+                "duration_minutes": duration_minutes,
+                "intervals": [
+                    {"start": interval_start, "end": interval_end}
+                    for interval_start, interval_end in intervals
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        Specialists with at least one bookable slot between `start` and `end` (datetimes),
+        optionally offering a service of `label` or named like `service`, within `radius`
+        kilometers of `latitude`/`longitude`. Slots fit `duration_minutes`, or else the
+        specialist's shortest matching service.
+        """
+        from hairstyle.availability import MAX_RANGE_DAYS
+
+        params = request.query_params
+        try:
+            start = self.parse_datetime(params["start"])
+            end = self.parse_datetime(params["end"])
+            duration_minutes = (
+                self.parse_duration(params["duration_minutes"])
+                if params.get("duration_minutes")
+                else None
+            )
+            label_id = int(params["label"]) if params.get("label") else None
+            location = None
+            if params.get("radius"):
+                location = (
+                    float(params["latitude"]),
+                    float(params["longitude"]),
+                    float(params["radius"]),
+                )
+        except KeyError as e:
+            return Response(
+                {"error": f"{e.args[0]} is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if end <= start:
+            return Response(
+                {"error": "end must be after start"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if end - start > datetime.timedelta(days=MAX_RANGE_DAYS):
+            return Response(
+                {"error": f"At most {MAX_RANGE_DAYS} days per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = find_available_specialists(
+            start,
+            end,
+            duration_minutes,
+            label_id=label_id,
+            service_name=params.get("service"),
+            location=location,
+        )
+        return Response(
+            {"start": start, "end": end, "count": len(results), "results": results},
+            status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def parse_datetime(value):
+        # times without an offset are local times
+        value = datetime.datetime.fromisoformat(value)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+    @staticmethod
+    def parse_duration(value):
+        # minutes, as a positive integer
+        try:
+            minutes = int(value)
+        except ValueError:
+            minutes = 0
+        if minutes <= 0:
+            raise ValueError("duration_minutes must be a positive integer")
+        return minutes
+
 
 class DayAvailabilityView(GenericView):
     permission_classes = [DRFIsAuthenticated]
     queryset = DayAvailability.objects.all()
     serializer_class = DayAvailabilitySerializer
+    allowed_methods = GenericView.allowed_methods + [
+        "bulk_create",
+        "bulk_update",
+        "bulk_delete",
+    ]
 
 
 class DayOffView(GenericView):
     permission_classes = [DRFIsAuthenticated]
     queryset = DayOff.objects.all()
     serializer_class = DayOffSerializer
+    allowed_methods = GenericView.allowed_methods + [
+        "bulk_create",
+        "bulk_update",
+        "bulk_delete",
+    ]
 
 
 class BarberShopView(GenericView):
@@ -198,6 +418,11 @@ class AppointmentTimeSlotView(GenericView):
     permission_classes = [DRFIsAuthenticated]
     queryset = AppointmentTimeSlot.objects.all()
     serializer_class = AppointmentTimeSlotSerializer
+    allowed_methods = GenericView.allowed_methods + [
+        "bulk_create",
+        "bulk_update",
+        "bulk_delete",
+    ]
 
 
 class QnaAnswerView(GenericView):
@@ -254,23 +479,58 @@ class UserNotificationView(GenericView):
     permission_classes = [DRFIsAuthenticated]
     queryset = UserNotification.objects.all().order_by("-created_at")
     serializer_class = UserNotificationSerializer
-    allowed_methods = ["list", "retrieve"]
+    allowed_methods = ["list", "retrieve", "export"]
+    cursor_pagination = True
+    fast_read = True
+    count_strategy = GenericView.COUNT_CACHED
+    cache_key_prefix = "user_notification"
+    cache_duration = 60 * 10
+    # has_active_appointment turns false when an appointment starts, without a write
+    cache_period = 60 * 5
+    cache_scope = GenericView.SCOPE_USER
+    cache_scope_users = ["user_id"]
+    # read by user.customer.total_points and has_active_appointment
+    cache_dependencies = [
+        "user__customer__reward_points",
+        "user__customer__Appointments",
+    ]
+    annotations = {
+        "user.customer.total_points": Customer.total_points_annotation(),
+        "user.customer.has_active_appointment": Customer.has_active_appointment_annotation,
+    }
+    shown_ids = None  # pks of the notifications serialized for this list page
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user).order_by("-created_at")
-    
+
     def list(self, request):
-        self.crud_middleware(request)
-        self.queryset = self.queryset.filter(user=self.request.user)
+        self.queryset = self.queryset.filter(user=request.user)
+        response = super().list(request)
+        # only the notifications this page shows are read; pages served from the cache
+        # were marked when they were built, and batch retrieves (?ids=) mark nothing
+        if (
+            response.status_code == status.HTTP_200_OK
+            and self.shown_ids
+            and self.batch_ids is None
+        ):
+            if self.queryset.filter(pk__in=self.shown_ids, is_read=False).update(
+                is_read=True
+            ):
+                # cached pages still show these notifications as unread
+                self.invalidate_cache_scopes([self.get_cache_scope()])
+        return response
+
+    def serialize(self, data, many=False):
+        if many and self.export_format is None:
+            data = list(data)
+            # rows are model instances, or values() dicts from the fast_read projection
+            self.shown_ids = [
+                row["pk"] if isinstance(row, dict) else row.pk for row in data
+            ]
+        return super().serialize(data, many)
 
-        try:
-            filters, excludes = self.parse_query_params(request)
-            top, bottom, order_by = self.get_pagination_params(filters)
-            res = self.filter(request, filters, excludes, top, bottom, order_by)
-            self.queryset.filter(user=self.request.user, is_read=False).update(is_read=True)
-            return res
-        except ValidationError as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-    
     def count(self, request):
-        return Response(self.queryset.filter(user=self.request.user, is_read=False).count(), status=status.HTTP_200_OK)
+        return Response(
+            self.queryset.filter(user=self.request.user, is_read=False).count(),
+            status=status.HTTP_200_OK,
+        )
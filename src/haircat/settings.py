@@ -48,16 +48,18 @@ INSTALLED_APPS = [
     "general",
     "account",
     "hairstyle",
-    'django_apscheduler',
+    "django_apscheduler",
 ]
 
 # Custom user model
 AUTH_USER_MODEL = "account.CustomUser"
 
 MIDDLEWARE = [
+    "haircat.utils.instrumentation.ServerTimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "account.middleware.JWTAuthMiddleware",
+    "haircat.utils.db_routing.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -99,7 +101,11 @@ CHANNEL_LAYERS = {
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql" if os.getenv("DB_NAME") else "django.db.backends.sqlite3",
+        "ENGINE": (
+            "django.db.backends.postgresql"
+            if os.getenv("DB_NAME")
+            else "django.db.backends.sqlite3"
+        ),
         "NAME": os.getenv("DB_NAME", BASE_DIR / "db.sqlite3"),
         "USER": os.getenv("DB_USER", ""),
         "PASSWORD": os.getenv("DB_PASSWORD", ""),
@@ -108,6 +114,27 @@ DATABASES = {
     }
 }
 
+# Read replicas for GenericView list/retrieve: comma separated hosts (PostgreSQL)
+# or database files (SQLite) holding a copy of the default database
+DATABASE_REPLICAS = []
+for index, replica in enumerate(
+    replica.strip()
+    for replica in os.getenv("DB_REPLICAS", "").split(",")
+    if replica.strip()
+):
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST" if os.getenv("DB_NAME") else "NAME": replica,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["haircat.utils.db_routing.ReplicaRouter"]
+
+# Seconds a client (and a cached view) reads from the primary after writing
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.sqlite3",
@@ -177,15 +204,41 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Get CSRF trusted origins from environment variable (comma-separated string)
 CSRF_TRUSTED_ORIGINS = [
-    'https://phtdhuvfm2.ap-southeast-1.awsapprunner.com',
-    'http://localhost:3000',
-    'http://127.0.0.1:3000',
-    'https://localhost:3000',
-    'exp://localhost:19000',
-    'exp://127.0.0.1:19000',
-    'exp://192.168.1.*:19000',
-    'https://haircat-api.sheldonarthursagrado.site',
-] + [origin.strip() for origin in os.getenv('CSRF_TRUSTED_ORIGINS', '').split(',') if origin.strip()]
+    "https://phtdhuvfm2.ap-southeast-1.awsapprunner.com",
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+    "https://localhost:3000",
+    "exp://localhost:19000",
+    "exp://127.0.0.1:19000",
+    "exp://192.168.1.*:19000",
+    "https://haircat-api.sheldonarthursagrado.site",
+] + [
+    origin.strip()
+    for origin in os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
+    if origin.strip()
+]
+
+
+# Entries kept by the in-process cache tier (haircat.utils.local_cache)
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "1000"))
+
+# Per-request performance metrics (haircat.utils.instrumentation)
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "True") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "haircat.performance": {
+            "handlers": ["console"],
+            "level": os.getenv("PERFORMANCE_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
 
 
 # APScheduler settings
@@ -0,0 +1,11 @@
+from .settings import *  # noqa: F401,F403
+
+# Settings of `manage.py test` (see manage.py)
+
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # ConcurrentBookingTest books from several threads at once. SQLite has no row locks
+    # (select_for_update is a no-op): transactions take the write lock when they begin,
+    # so the bookings run one after the other instead of failing with "database is locked"
+    DATABASES["default"]["OPTIONS"] = {"transaction_mode": "IMMEDIATE"}
+    # and an in-memory SQLite test database cannot be shared between threads
+    DATABASES["default"]["TEST"] = {"NAME": BASE_DIR / "test_db.sqlite3"}
@@ -0,0 +1,121 @@
+import datetime
+from itertools import count
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from account.models import CustomUser, Customer, Specialist
+from general.models import File
+from haircat.utils.fast_read import compile_projection
+from haircat.utils.fieldsets import parse_fieldset, prune_fields
+from hairstyle.models import Appointment, Service
+
+# Fixtures and assertions shared by the apps' tests
+
+_sequence = count(1)
+
+
+def create_user(pfp=None, **fields):
+    number = next(_sequence)
+    if pfp is None:
+        pfp = File.objects.create(
+            name=f"pfp{number}", url=f"https://example.com/pfp{number}.png"
+        )
+    fields.setdefault("username", f"user{number}")
+    fields.setdefault("email", f"user{number}@example.com")
+    return CustomUser.objects.create(pfp=pfp, **fields)
+
+
+def create_specialist(**fields):
+    fields.setdefault("auto_accept_appointment", True)
+    return Specialist.objects.create(user=create_user(), **fields)
+
+
+def create_customer():
+    return Customer.objects.create(user=create_user())
+
+
+def create_service(specialist=None, **fields):
+    fields.setdefault("name", "Haircut")
+    fields.setdefault("description", "Haircut")
+    fields.setdefault("price", 100)
+    fields.setdefault("duration_minutes", 45)
+    return Service.objects.create(
+        specialist=specialist or create_specialist(), **fields
+    )
+
+
+def create_appointment(service, customer=None, schedule=None, **fields):
+    if schedule is None:
+        schedule = timezone.now().replace(second=0, microsecond=0) + datetime.timedelta(
+            days=2
+        )
+    return Appointment.objects.create(
+        service=service,
+        customer=customer or create_customer(),
+        schedule=schedule,
+        **fields,
+    )
+
+
+class FastReadTestMixin:
+    """
+    # FastReadTestMixin
+    Checks that compiled projections of fast_read views return what their serializers do.
+
+    **Attributes**
+    - FIELDSETS: {view: [`?fields=` values the projection must support]}
+    """
+
+    FIELDSETS = {}
+
+    def test_projection_matches_serializer(self):
+        for view, fieldsets in self.FIELDSETS.items():
+            queryset = view.queryset.order_by("pk")
+            for fieldset in fieldsets:
+                with self.subTest(view=view.__name__, fields=fieldset):
+                    serializer = view.serializer_class(queryset, many=True)
+                    prune_fields(serializer, parse_fieldset(fieldset))
+                    projection = compile_projection(serializer.child, queryset.model)
+                    self.assertIsNotNone(projection)
+                    self.assertEqual(
+                        projection.represent_many(projection.apply(queryset)),
+                        serializer.data,
+                    )
+
+
+def call_view(
+    view, actions, user, query="", method="get", data=None, headers=None, **kwargs
+):
+    """Rendered response of `view` for a request by `user`"""
+    request = getattr(APIRequestFactory(), method)(
+        f"/?{query}" if query else "/", data, format="json", headers=headers
+    )
+    force_authenticate(request, user=user)
+    response = view.as_view(actions)(request, **kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    return response
+
+
+class QueryCountMixin:
+    """
+    # QueryCountMixin
+    Asserts that list endpoints run the same queries whatever their page size.
+    """
+
+    def count_list_queries(self, view, user, size, query=""):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = call_view(
+                view, {"get": "list"}, user, f"top=0&bottom={size}&{query}"
+            )
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertFlatQueries(self, view, user, query="", sizes=(2, 6)):
+        counts = [self.count_list_queries(view, user, size, query) for size in sizes]
+        self.assertEqual(counts, [counts[0]] * len(counts), f"{view.__name__} {query}")
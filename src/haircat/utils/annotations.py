@@ -0,0 +1,154 @@
+from functools import partial
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Manager, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+from rest_framework.fields import get_attribute
+
+
+def get_annotation_alias(name):
+    # model properties cannot be assigned, so annotations never use the field name itself
+    return "annotated_" + name.replace(".", "_")
+
+
+def aggregate_subquery(queryset, outer_field, aggregate):
+    """
+    `aggregate` over the rows of `queryset` whose `outer_field` is the annotated row, 0 without rows.
+    A correlated subquery adds no join or GROUP BY to the outer query, so several of them
+    do not multiply each other's rows and count() leaves them out.
+    """
+    rows = (
+        queryset.filter(**{outer_field: OuterRef("pk")})
+        .order_by()
+        .values(outer_field)
+        .annotate(value=aggregate)
+        .values("value")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def resolve_annotations(providers, names):
+    """
+    {alias: expression} for the providers of `names`.
+    Providers are query expressions, or callables returning one when the query is built
+    (for expressions depending on the request time or user).
+    """
+    annotations = {}
+    for name in names:
+        provider = providers[name]
+        if callable(provider) and not hasattr(provider, "resolve_expression"):
+            provider = provider()
+        annotations[get_annotation_alias(name)] = provider
+    return annotations
+
+
+def is_nested(name):
+    return "." in name
+
+
+def _get_target(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        return serializer.child
+    return serializer
+
+
+def _walk(serializer, name):
+    """
+    (leaf field, [(source_attrs, many)] of the nested serializers leading to it) of the
+    field path `name`, or (None, None) when the path is not in the serializer
+    """
+    serializer = _get_target(serializer)
+    *parents, leaf = name.split(".")
+    path = []
+    for parent in parents:
+        field = serializer.fields.get(parent)
+        if not isinstance(field, serializers.BaseSerializer):
+            return None, None
+        path.append((field.source_attrs, isinstance(field, serializers.ListSerializer)))
+        serializer = _get_target(field)
+    return serializer.fields.get(leaf), path
+
+
+def has_annotated_field(serializer, name):
+    return _walk(serializer, name)[0] is not None
+
+
+def read_annotations(serializer, names):
+    """
+    Point the fields `names` (dotted paths for nested serializers) of `serializer`
+    at their annotations. Objects that were not loaded with the annotations
+    (e.g. just created) still read the original source, so the output is the same either way.
+    """
+    for name in names:
+        field, path = _walk(serializer, name)
+        if field is None:
+            continue
+        alias = get_annotation_alias(name)
+        field.get_attribute = partial(_read_annotation, alias, field.source_attrs)
+        if not path:
+            # fast_read projections select root level aliases as columns
+            field.source_attrs = [alias]
+
+
+def attach_annotations(serializer, providers, names, objects):
+    """
+    Annotate the related objects nested serializers of `serializer` read from `objects`,
+    with one query per nested serializer for the whole page.
+    Providers of nested fields are expressions over the nested serializer's model.
+    """
+    groups = {}
+    for name in names:
+        if not is_nested(name):
+            continue
+        field, path = _walk(serializer, name)
+        if field is not None:
+            key = tuple((tuple(attrs), many) for attrs, many in path)
+            groups.setdefault(key, []).append(name)
+
+    for path, group in groups.items():
+        related = _collect(objects, path)
+        if not related:
+            continue
+        annotations = resolve_annotations(providers, group)
+        rows = (
+            type(related[0])
+            ._base_manager.db_manager(related[0]._state.db)
+            .filter(pk__in={instance.pk for instance in related})
+            .annotate(**annotations)
+            .values("pk", *annotations)
+        )
+        rows = {row["pk"]: row for row in rows}
+        for instance in related:
+            row = rows.get(instance.pk)
+            if row is None:
+                continue
+            for alias in annotations:
+                setattr(instance, alias, row[alias])
+
+
+def _collect(objects, path):
+    # the related objects the serializers along `path` read, reached the way DRF does
+    current = list(objects)
+    for source_attrs, many in path:
+        found = []
+        for instance in current:
+            try:
+                value = get_attribute(instance, source_attrs)
+            except (AttributeError, KeyError, ObjectDoesNotExist):
+                continue
+            if value is None:
+                continue
+            if many:
+                found.extend(value.all() if isinstance(value, Manager) else value)
+            else:
+                found.append(value)
+        current = found
+    return current
+
+
+def _read_annotation(alias, source_attrs, instance):
+    try:
+        return getattr(instance, alias)
+    except AttributeError:
+        return get_attribute(instance, source_attrs)
@@ -0,0 +1,144 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import ForeignObjectRel
+from django.db.models.signals import m2m_changed, post_save, pre_delete, pre_save
+
+# model -> CacheDependency list
+_dependencies = defaultdict(list)
+
+
+class CacheDependency:
+    """
+    # CacheDependency
+    Rows of a model that are embedded in the cached payloads of a GenericView.
+
+    **Attributes**
+    - view: GenericView subclass whose cache holds the rows
+    - lookup: relation path from the view's model to the rows ("" for the view's own model)
+    - movable: the rows hold the foreign key toward the view's objects,
+      so saving one can move it from one cached object to another
+    """
+
+    def __init__(self, view, lookup, movable):
+        self.view = view
+        self.lookup = lookup
+        self.movable = movable
+
+    def find_dependents(self, pks):
+        """
+        (pk, user ids...) of the view's objects that embed the rows `pks`;
+        the user ids come from the view's cache_scope_users
+        """
+        user_lookups = self.view.get_scope_user_lookups()
+        if not self.lookup and not user_lookups:
+            return [(pk,) for pk in pks]
+        lookup = f"{self.lookup}__in" if self.lookup else "pk__in"
+        model = self.view.queryset.model
+        return list(
+            model._base_manager.filter(**{lookup: pks})
+            .values_list("pk", *user_lookups)
+            .distinct()
+        )
+
+    def __repr__(self):
+        return f"CacheDependency({self.view.__name__}, {self.lookup!r}, movable={self.movable})"
+
+
+def register_view(view):
+    """
+    Record which models `view` embeds in its cached payloads and connect the
+    invalidation handlers of those models. Called for every cached GenericView subclass.
+    """
+    for lookup, model, field in view.get_cache_dependencies():
+        movable = field is not None and not field.concrete and not field.many_to_many
+        _dependencies[model].append(CacheDependency(view, lookup, movable))
+        pre_save.connect(_pre_save, sender=model)
+        post_save.connect(_post_save, sender=model)
+        pre_delete.connect(_pre_delete, sender=model)
+        if field is not None and field.many_to_many:
+            if isinstance(field, ForeignObjectRel):
+                through = field.through
+            else:
+                through = field.remote_field.through
+            m2m_changed.connect(_m2m_changed, sender=through)
+
+
+def collect_dependents(model, pks, movable_only=False, affected=None):
+    """
+    Cached objects embedding the `model` rows `pks`, as {view: (object pks, user ids)}
+    """
+    affected = {} if affected is None else affected
+    for dependency in _dependencies.get(model, ()):
+        if movable_only and not dependency.movable:
+            continue
+        rows = dependency.find_dependents(pks)
+        if not rows:
+            continue
+        object_pks, user_ids = affected.setdefault(dependency.view, (set(), set()))
+        for pk, *users in rows:
+            object_pks.add(pk)
+            user_ids.update(user for user in users if user is not None)
+    return affected
+
+
+def invalidate_dependents(model, pks, using=None):
+    """
+    Invalidate every cache entry embedding the `model` rows `pks` once the current
+    transaction commits, for writes that send no signals (bulk_create, bulk_update, update())
+    """
+    _schedule(collect_dependents(model, list(pks)), using)
+
+
+def has_other_receivers(signal, sender):
+    """
+    Whether `signal` has receivers for `sender` besides the handlers in this module
+    """
+    sync_receivers, async_receivers = signal._live_receivers(sender)
+    return any(
+        receiver not in _handlers for receiver in (*sync_receivers, *async_receivers)
+    )
+
+
+def _invalidate(affected):
+    for view, (pks, user_ids) in affected.items():
+        view.invalidate_dependents(pks, user_ids)
+
+
+def _schedule(affected, using):
+    # readers racing the transaction would otherwise cache the old rows again
+    if affected:
+        transaction.on_commit(lambda: _invalidate(affected), using=using)
+
+
+def _pre_save(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    # objects embedding the row before a foreign key change moves it elsewhere
+    instance._cache_dependents = collect_dependents(
+        sender, [instance.pk], movable_only=True
+    )
+
+
+def _post_save(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    affected = instance.__dict__.pop("_cache_dependents", None)
+    _schedule(collect_dependents(sender, [instance.pk], affected=affected), using)
+
+
+def _pre_delete(sender, instance, using=None, **kwargs):
+    # after the delete the relation paths no longer lead to the dependents
+    _schedule(collect_dependents(sender, [instance.pk]), using)
+
+
+def _m2m_changed(sender, instance, action, model, pk_set, using=None, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    affected = collect_dependents(type(instance), [instance.pk])
+    if pk_set:
+        collect_dependents(model, list(pk_set), affected=affected)
+    _schedule(affected, using)
+
+
+_handlers = (_pre_save, _post_save, _pre_delete, _m2m_changed)
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+
+def _new_generation():
+    # Millisecond clock so a counter that was evicted never restarts at a value
+    # whose keys may still be cached
+    return int(time.time() * 1000)
+
+
+def get_generation(key, timeout=None):
+    """
+    Current value of the generation counter stored at `key`.
+    Counters never expire by default; keys built from an old generation simply stop being read.
+    A counter that expires restarts from the clock, above any value it had.
+    """
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key, timeout=None):
+    """
+    Move the generation counter at `key` forward in O(1) on any cache backend,
+    and record when it moved (see get_generation_modified()).
+    """
+    try:
+        generation = cache.incr(key)
+    except ValueError:
+        # counter is missing (never read or evicted)
+        cache.add(key, _new_generation(), timeout)
+        generation = cache.incr(key)
+    cache.set(_get_modified_key(key), time.time(), timeout)
+    return generation
+
+
+def get_generation_modified(key, timeout=None):
+    """
+    UNIX time the generation counter at `key` last moved.
+    A missing record restarts from now, so it is never older than the last move.
+    """
+    modified_key = _get_modified_key(key)
+    modified = cache.get(modified_key)
+    if modified is None:
+        cache.add(modified_key, time.time(), timeout)
+        modified = cache.get(modified_key)
+    return modified
+
+
+def _get_modified_key(key):
+    return f"{key}_modified"
+
+
+def get_params_digest(params):
+    """
+    Stable digest of request parameters: keys are sorted and values normalized
+    through JSON, so equal requests map to the same key in every process.
+    """
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()
@@ -0,0 +1,121 @@
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_read_alias = contextvars.ContextVar("haircat_read_alias", default=None)
+
+PIN_COOKIE = "db_pinned"
+
+
+def get_replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def get_pin_seconds():
+    return getattr(settings, "REPLICA_PIN_SECONDS", 5)
+
+
+class ReplicaRouter:
+    """
+    # ReplicaRouter
+    Sends reads to the replica selected with `route_reads_to_replica()` (GenericView list/retrieve)
+    and everything else to the primary (`default`). Replicas are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # objects read from a replica are still saved on the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
+
+
+def route_reads_to_replica():
+    """
+    Send reads of the current request to a random replica.
+    Returns a token for `release_replica()`, or None when no replica may be used
+    (none configured, or inside a transaction on the primary, which must see its own writes).
+    """
+    replicas = get_replicas()
+    if not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return None
+    return _read_alias.set(random.choice(replicas))
+
+
+def release_replica(token):
+    _read_alias.reset(token)
+
+
+def get_user_pin_key(user_id):
+    return f"db_pinned_user_{user_id}"
+
+
+def is_pinned(request):
+    """
+    Whether the client wrote within the last REPLICA_PIN_SECONDS and must read from the primary
+    """
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(get_user_pin_key(user.pk)))
+
+
+def pin(request, response):
+    """
+    Pin the client to the primary: per user through the cache (shared by every worker and device),
+    and through a cookie for anonymous clients
+    """
+    seconds = get_pin_seconds()
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        cache.set(get_user_pin_key(user.pk), True, seconds)
+    response.set_cookie(PIN_COOKIE, "1", max_age=seconds, httponly=True, samesite="Lax")
+
+
+def mark_written(keys):
+    """
+    Flag `keys` (list generation keys) as written for REPLICA_PIN_SECONDS,
+    so cache rebuilds read from the primary until the replicas have caught up
+    """
+    if get_replicas():
+        cache.set_many({f"{key}_written": True for key in keys}, get_pin_seconds())
+
+
+def was_written(keys):
+    if not get_replicas():
+        return False
+    return any(cache.get_many([f"{key}_written" for key in keys]).values())
+
+
+class ReplicaPinningMiddleware:
+    """
+    Pin clients whose request changed data (unsafe method, successful response)
+    to the primary for REPLICA_PIN_SECONDS, so they read their own writes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            get_replicas()
+            and request.method not in ("GET", "HEAD", "OPTIONS", "TRACE")
+            and response.status_code < 400
+        ):
+            pin(request, response)
+        return response
@@ -0,0 +1,106 @@
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def iter_chunks(queryset, chunk_size):
+    """
+    Lists of at most `chunk_size` objects, fetched with `queryset.iterator()`
+    so only one chunk (and its prefetched relations) is in memory at a time.
+    """
+    iterator = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_csv_columns(serializer, prefix=""):
+    """
+    (columns, nested) of a serializer's CSV export: the dotted columns of its readable
+    fields in output order, and the dotted names of the nested objects expanded into them.
+    Many relations and other values that are not nested serializers stay one JSON column.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    columns = []
+    nested = set()
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        column = f"{prefix}{name}"
+        if isinstance(field, serializers.Serializer):
+            nested.add(column)
+            child_columns, child_nested = get_csv_columns(field, f"{column}.")
+            columns.extend(child_columns)
+            nested.update(child_nested)
+        else:
+            columns.append(column)
+    return columns, nested
+
+
+def flatten_row(data, nested, prefix=""):
+    """
+    Flatten nested serializer output into dotted columns:
+    {"user": {"id": 1}} -> {"user.id": 1}. A null nested object leaves its columns empty,
+    other dicts and lists are kept as JSON.
+    """
+    row = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if name in nested:
+            if value is not None:
+                row.update(flatten_row(value, nested, f"{name}."))
+        elif isinstance(value, (dict, list)):
+            row[name] = json.dumps(value, cls=JSONEncoder)
+        else:
+            row[name] = value
+    return row
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def render_ndjson(chunks):
+    for rows in chunks:
+        yield "".join(json.dumps(row, cls=JSONEncoder) + "\n" for row in rows)
+
+
+def render_csv(chunks, serializer):
+    """
+    CSV lines per chunk, after a header built from `serializer` (the one producing the rows),
+    so every row has the same columns whatever its nested objects hold.
+    """
+    columns, nested = get_csv_columns(serializer)
+    writer = csv.DictWriter(Echo(), fieldnames=columns, restval="")
+    yield writer.writeheader()
+    for rows in chunks:
+        yield "".join(writer.writerow(flatten_row(row, nested)) for row in rows)
+
+
+async def iterate_async(iterator):
+    """
+    Drive a synchronous (database backed) iterator from an ASGI response
+    one item at a time, so the server does not collect it into a list first.
+    """
+    sentinel = object()
+    next_item = sync_to_async(next, thread_sensitive=True)
+    while True:
+        item = await next_item(iterator, sentinel)
+        if item is sentinel:
+            return
+        yield item
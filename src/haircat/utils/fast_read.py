@@ -0,0 +1,179 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import fields as drf_fields
+from rest_framework import serializers
+from rest_framework.relations import PKOnlyObject
+
+
+class Unsupported(Exception):
+    """The serializer reads something a values() projection cannot provide."""
+
+
+class Projection:
+    """
+    # Projection
+    Read-only representation of a serializer compiled to a `values()` query.
+    Rows come back as flat dicts and are assembled into the same nested output
+    the serializer would produce, without building model or serializer instances.
+
+    **Attributes**
+    - columns: values() lookups needed by the representation
+    """
+
+    def __init__(self, columns, build):
+        self.columns = columns
+        self.build = build
+
+    def apply(self, queryset):
+        return queryset.values(*self.columns)
+
+    def represent(self, row):
+        return self.build(row)
+
+    def represent_many(self, rows):
+        build = self.build
+        return [build(row) for row in rows]
+
+
+def _is_plain_field(field):
+    # fields whose value is read straight from the attribute and passed to to_representation
+    return type(
+        field
+    ).get_attribute is drf_fields.Field.get_attribute and not isinstance(
+        field,
+        (
+            serializers.SerializerMethodField,
+            serializers.HiddenField,
+            serializers.ModelField,
+            serializers.FileField,
+            serializers.ListField,
+            serializers.DictField,
+        ),
+    )
+
+
+def _follow(model, attrs, prefix):
+    """
+    Resolve the relation segments of a source.
+    Every segment must be single valued, and forward relations crossed before
+    the last segment must be non-null (a null one would make DRF skip the field).
+    Returns (model, lookup prefix).
+    """
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise Unsupported(f"{model.__name__}.{attr} is not a model field")
+        if not field.is_relation or field.many_to_many or field.one_to_many:
+            raise Unsupported(f"{model.__name__}.{attr} is not a single relation")
+        if field.concrete and field.null:
+            raise Unsupported(f"{model.__name__}.{attr} is nullable")
+        model = field.related_model
+        prefix = f"{prefix}{attr}__"
+    return model, prefix
+
+
+def _relation_column(model, attr, prefix):
+    """
+    Column that is NULL exactly when `attr` resolves to None:
+    the local FK column for forward relations, the related pk for reverse one-to-one.
+    """
+    try:
+        field = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        raise Unsupported(f"{model.__name__}.{attr} is not a model field")
+    if not field.is_relation or field.many_to_many or field.one_to_many:
+        raise Unsupported(f"{model.__name__}.{attr} is not a single relation")
+    if field.concrete:
+        return field.related_model, f"{prefix}{attr}"
+    return field.related_model, f"{prefix}{attr}__pk"
+
+
+def _leaf_column(model, attr, prefix, annotations):
+    if not prefix and attr in annotations:
+        return attr
+    try:
+        field = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        raise Unsupported(f"{model.__name__}.{attr} is not a model field")
+    if not field.concrete or isinstance(field, models.FileField):
+        raise Unsupported(f"{model.__name__}.{attr} is not a plain column")
+    if field.is_relation and attr != field.attname:
+        raise Unsupported(f"{model.__name__}.{attr} is a relation")
+    return f"{prefix}{attr}"
+
+
+def _compile_serializer(serializer, model, prefix, annotations, columns):
+    if isinstance(serializer, serializers.ListSerializer):
+        raise Unsupported("many=True serializers need a second query")
+    if (
+        type(serializer).to_representation
+        is not serializers.Serializer.to_representation
+    ):
+        raise Unsupported(f"{type(serializer).__name__} overrides to_representation")
+
+    items = []
+    for field in serializer._readable_fields:
+        attrs = field.source_attrs
+        if field.source == "*" or not attrs:
+            raise Unsupported(f"{field.field_name} reads the whole object")
+
+        if isinstance(field, serializers.BaseSerializer):
+            parent, parent_prefix = _follow(model, attrs[:-1], prefix)
+            related, column = _relation_column(parent, attrs[-1], parent_prefix)
+            child = _compile_serializer(
+                field, related, f"{parent_prefix}{attrs[-1]}__", annotations, columns
+            )
+            items.append((field.field_name, column, None, child))
+        elif isinstance(field, serializers.RelatedField):
+            if not field.use_pk_only_optimization():
+                raise Unsupported(f"{field.field_name} needs the related object")
+            parent, parent_prefix = _follow(model, attrs[:-1], prefix)
+            related, column = _relation_column(parent, attrs[-1], parent_prefix)
+
+            def to_representation(value, field=field):
+                return field.to_representation(PKOnlyObject(pk=value))
+
+            items.append((field.field_name, column, to_representation, None))
+        elif _is_plain_field(field):
+            parent, parent_prefix = _follow(model, attrs[:-1], prefix)
+            column = _leaf_column(parent, attrs[-1], parent_prefix, annotations)
+            items.append((field.field_name, column, field.to_representation, None))
+        else:
+            raise Unsupported(f"{field.field_name} is a {type(field).__name__}")
+
+    for _, column, _, _ in items:
+        if column not in columns:
+            columns.append(column)
+
+    def build(row):
+        data = {}
+        for name, column, to_representation, child in items:
+            value = row[column]
+            if value is None:
+                data[name] = None
+            elif child is not None:
+                data[name] = child(row)
+            else:
+                data[name] = to_representation(value)
+        return data
+
+    return build
+
+
+def compile_projection(serializer, model, annotations=()):
+    """
+    Compile `serializer` into a Projection over `model`, or None when any readable field
+    needs more than a column: properties, methods, files, many relations, custom representations.
+
+    **Args**
+    - serializer: serializer instance (already pruned to the requested fieldset)
+    - model: the serializer's model class
+    - annotations: names of annotations on the queryset that may back root level fields
+    """
+    columns = ["pk"]
+    try:
+        build = _compile_serializer(serializer, model, "", set(annotations), columns)
+    except Unsupported:
+        return None
+    return Projection(columns, build)
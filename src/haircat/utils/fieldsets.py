@@ -0,0 +1,79 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def parse_fieldset(value):
+    """
+    Parse a `?fields=` / `?omit=` value into a tree of field names.
+    `id,customer.user.full_name` -> {"id": {}, "customer": {"user": {"full_name": {}}}}
+    """
+    tree = {}
+    for path in value.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _get_target(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        return serializer.child
+    return serializer
+
+
+def prune_fields(serializer, include=None, omit=None):
+    """
+    Drop fields from `serializer` (and nested serializers) before anything is evaluated.
+
+    **Args**
+    - serializer: serializer instance, `many=True` serializers are pruned through their child
+    - include: fieldset tree of fields to keep, nested serializers without a subtree are kept whole
+    - omit: fieldset tree of fields to drop
+    """
+    target = _get_target(serializer)
+    if not isinstance(target, serializers.Serializer):
+        return
+
+    fields = target.fields
+    if include:
+        for name in list(fields):
+            if name not in include:
+                fields.pop(name)
+            elif include[name]:
+                prune_fields(fields[name], include=include[name])
+    if omit:
+        for name, subtree in omit.items():
+            if name not in fields:
+                continue
+            if subtree:
+                prune_fields(fields[name], omit=subtree)
+            else:
+                fields.pop(name)
+
+
+def get_deferrable_fields(serializer, model):
+    """
+    Local columns of `model` that no readable field of `serializer` reads.
+    Returns nothing if any field is backed by a property or method,
+    since those may read any column.
+    """
+    target = _get_target(serializer)
+    used = set()
+    for field in target.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*":
+            return []
+        try:
+            used.add(model._meta.get_field(field.source_attrs[0]).name)
+        except FieldDoesNotExist:
+            return []
+
+    return [
+        field.name
+        for field in model._meta.concrete_fields
+        if not field.primary_key and not field.is_relation and field.name not in used
+    ]
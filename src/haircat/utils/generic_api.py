@@ -2,14 +2,77 @@ from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 
 from django.shortcuts import get_object_or_404
 from django.core.cache import cache
-from django.db.models import Q
-from django.core.paginator import Paginator
-from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Q
+from django.db.models.signals import post_save, pre_save
+from django.db import IntegrityError, models, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
+import datetime
 import json
+import math
+import time
+
+from .annotations import (
+    attach_annotations,
+    get_annotation_alias,
+    has_annotated_field,
+    is_nested,
+    read_annotations,
+    resolve_annotations,
+)
+from .cache_dependencies import (
+    has_other_receivers,
+    invalidate_dependents,
+    register_view,
+)
+from .caching import (
+    bump_generation,
+    get_generation,
+    get_generation_modified,
+    get_params_digest,
+)
+from .db_routing import (
+    is_pinned,
+    mark_written,
+    release_replica,
+    route_reads_to_replica,
+    was_written,
+)
+from .export import (
+    EXPORT_FORMATS,
+    iter_chunks,
+    iterate_async,
+    render_csv,
+    render_ndjson,
+)
+from .fast_read import compile_projection
+from .fieldsets import get_deferrable_fields, parse_fieldset, prune_fields
+from .instrumentation import record_cache_lookup, timer
+from .local_cache import (
+    process_cache,
+    local_get,
+    local_get_many,
+    invalidations_are_broadcast,
+    local_invalidate,
+)
+from .query_plan import build_query_plan, get_relation_paths
+from .rendering import RenderedEntry, join_objects
+from .pagination import (
+    CountedPaginator,
+    KeysetPaginator,
+    estimate_count,
+    get_query_signature,
+)
 
 
 class GenericView(viewsets.ViewSet):
@@ -20,25 +83,72 @@ class GenericView(viewsets.ViewSet):
     - serializer_class: DRF model serializer class
 
     **Optional attributes**
-    - allowed_methods: list of allowed methods (default: ['list', 'retrieve', 'create', 'update', 'delete'])
+    - allowed_methods: list of allowed methods (default: ['list', 'retrieve', 'create', 'update', 'delete'],
+      bulk endpoints are enabled with 'bulk_create', 'bulk_update' and 'bulk_delete',
+      streaming exports with 'export')
     - allowed_filter_fields: list of allowed filter fields (default: ['*'])
     - allowed_update_fields: list of allowed update fields (default: ['*'])
     - size_per_request: number of objects to return per request (default: 20)
     - permission_classes: list of permission classes
     - cache_key_prefix: cache key prefix
     - cache_duration: cache duration in seconds (default: 1 hour)
+    - cache_scope: who shares cache entries: global, user or role (default: global)
+    - cache_scope_users: paths from an object to the ids of users whose scoped entries it affects
+      (e.g. ['user_id', 'appointment.customer.user_id']), used for targeted invalidation
+    - stale_while_revalidate: seconds past cache_duration a cached copy may still be served
+      while another request rebuilds it (default: 0)
+    - cache_lock_timeout: seconds a cache rebuild lock is held at most (default: 10)
+    - cache_gzip_min_size: list entries of at least this many bytes are cached gzip compressed
+      and sent as is to clients accepting gzip (default: None, off)
+    - cache_period: seconds during which payloads depending on the current time (e.g. availability
+      statuses) stay valid; cache keys and validators include the current period and entries
+      expire with it (default: None, off)
+    - local_cache_duration: seconds cache entries are also kept in process memory, in front of
+      the shared cache; generations are always read from the shared cache, and global object
+      entries are only kept locally when the channel layer broadcasts their eviction (default: 0, off)
+    - cache_dependencies: extra relation paths from the model to data embedded in the payload
+      that the serializer does not declare (e.g. read by SerializerMethodFields); changes to
+      those rows invalidate the cache like changes to nested serializers do
+    - auto_query_plan: derive select_related/prefetch_related from serializer_class (default: True)
+    - select_related_fields: extra select_related lookups (e.g. relations reached through model properties),
+      either a list or a dict of serializer field name -> lookups needed by that field
+    - prefetch_related_fields: extra prefetch_related lookups or Prefetch objects, list or dict like select_related_fields
+    - annotations: dict of serializer field path (e.g. 'total_points' or 'labels.label.total_services') ->
+      query expression (or callable returning one) over the model of the serializer holding the field;
+      root fields are computed in the read query, nested ones in one query per nested serializer for
+      the whole page, and the field reads the annotation instead of running its model property per object
+    - cursor_pagination: allow clients to page with opaque `cursor` tokens (default: False)
+    - cursor_order_by: default cursor ordering field (default: queryset/model ordering, then pk)
+    - count_strategy: how total_count is computed: exact, cached, estimated or none (default: exact)
+    - count_cache_duration: cache duration in seconds for cached counts (default: 60)
+    - bulk_max_size: maximum number of objects per bulk request (default: 100)
+    - conditional_requests: send ETag/Last-Modified and answer If-None-Match/If-Modified-Since with 304 (default: False)
+    - last_modified_field: model field holding the modification time (default: 'updated_at')
+    - export_chunk_size: rows fetched and serialized at a time by ?export= (default: 500)
+    - fast_read: build read responses from a compiled values() projection of serializer_class
+      when every readable field maps to a column (default: False)
+    - replica_reads: run list/retrieve queries on a read replica (settings.DATABASE_REPLICAS)
+      unless the client or the view's cache was written within REPLICA_PIN_SECONDS (default: True)
 
     **API endpoints**
     - GET /: list objects
+    - GET /?export=ndjson|csv: stream every matching object
     - GET /<pk>: retrieve object
+    - GET /?ids=1,2,3: retrieve several objects in the given order
     - POST /: create object
     - PUT /<pk>: update object
     - DELETE /<pk>: delete object
+    - POST /bulk/: create a list of objects
+    - PUT /bulk/: update a list of objects (each with its id)
+    - DELETE /bulk/: delete objects by id ({"ids": [...]} or ?ids=)
 
     **Features**
-    - Pagination
+    - Pagination (page/offset or keyset cursors)
     - Filtering
+    - Sparse fieldsets (?fields= / ?omit=)
     - Caching
+    - Conditional GET (ETag / Last-Modified)
+    - Query planning (select_related/prefetch_related)
     - CRUD operations
     """
 
@@ -54,64 +164,177 @@ class GenericView(viewsets.ViewSet):
     cache_key_prefix = None  # cache key prefix
     cache_duration = 60 * 60  # cache duration in seconds
 
+    SCOPE_GLOBAL = "global"  # one entry shared by every user
+    SCOPE_USER = "user"  # entries per request.user
+    SCOPE_ROLE = "role"  # entries per role (specialist, customer, ...)
+    cache_scope = SCOPE_GLOBAL
+    cache_scope_users = []  # paths from an object to affected user ids
+    list_generation = None  # list cache generation read during this request
+    # seconds past expiry a cached copy may be served during a rebuild
+    stale_while_revalidate = 0
+    cache_lock_timeout = 10  # seconds a cache rebuild lock is held at most
+    rebuild_lock = None  # rebuild lock held by this request
+    served_stale = False  # a stale copy answers this request
+    cache_dependencies = []  # extra relation paths to data embedded in the payload
+    local_cache_duration = 0  # seconds entries are also kept in process memory (0: off)
+    # list entries of at least this many bytes are cached compressed
+    cache_gzip_min_size = None
+    # seconds payloads depending on the current time stay valid (None: off)
+    cache_period = None
+    current_period = None  # (index, start, end) of the cache period of this request
+
+    # derive select_related/prefetch_related from serializer_class
+    auto_query_plan = True
+    select_related_fields = []  # extra select_related lookups
+    prefetch_related_fields = []  # extra prefetch_related lookups or Prefetch objects
+    annotations = {}  # serializer field path -> expression computed in the read query
+
+    cursor_pagination = False  # allow keyset pagination with ?cursor=
+    cursor_order_by = None  # default cursor ordering field
+    cursor = None  # current request's cursor ("" for the first page)
+
+    requested_fields = None  # ?fields= tree for this request
+    omitted_fields = None  # ?omit= tree for this request
+    export_format = None  # ?export= format for this request
+    batch_ids = None  # ?ids= of a batch retrieve
+
+    COUNT_EXACT = "exact"  # COUNT(*) on every request
+    COUNT_CACHED = "cached"  # COUNT(*) cached per filter signature
+    COUNT_ESTIMATED = "estimated"  # PostgreSQL planner estimate for large results
+    COUNT_NONE = "none"  # no count, only has_more
+    count_strategy = COUNT_EXACT
+    count_cache_duration = 60  # cache duration in seconds for cached counts
+    count_estimate_threshold = 1000  # estimates below this are counted exactly
+
+    bulk_max_size = 100  # maximum number of objects per bulk request
+
+    conditional_requests = False  # ETag/Last-Modified validators on list and retrieve
+    last_modified_field = "updated_at"  # model field holding the modification time
+
+    export_chunk_size = 500  # rows fetched and serialized at a time by ?export=
+
+    # serialize reads from a compiled values() projection when possible
+    fast_read = False
+
+    replica_reads = True  # list/retrieve read from a replica when one is configured
+    read_replica = None  # token of the replica routing for this request
+
     def __init__(self):
         if self.queryset is None or not self.serializer_class:
             raise NotImplementedError("queryset and serializer_class must be defined")
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_key_prefix and cls.queryset is not None and cls.serializer_class:
+            register_view(cls)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            self.release_read_replica()
+
     # CRUD operations
     def list(self, request):
         if "list" not in self.allowed_methods:
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
-        
+
         self.crud_middleware(request)
+        self.use_read_replica()
 
         try:
             filters, excludes = self.parse_query_params(request)
             top, bottom, order_by = self.get_pagination_params(filters)
+            if self.export_format is not None:
+                return self.export(filters, excludes, order_by)
+            if self.batch_ids is not None:
+                return self.retrieve_many(self.batch_ids)
+
+            etag, last_modified = self.get_list_validators(
+                filters, excludes, top, bottom, order_by
+            )
+            not_modified = self.get_not_modified_response(request, etag, last_modified)
+            if not_modified:
+                return not_modified
 
             cached_data = None
             if self.cache_key_prefix:
                 cache_key = self.get_list_cache_key(
                     filters, excludes, top, bottom, order_by
                 )
-                cached_data = cache.get(cache_key)
+                cached_data = self.get_cached(cache_key)
+                if cached_data is None:
+                    stale_key = self.get_list_cache_key(
+                        filters, excludes, top, bottom, order_by, stale=True
+                    )
+                    cached_data = self.wait_for_rebuild(cache_key, stale_key)
             if cached_data:
-                return Response(cached_data, status=status.HTTP_200_OK)
-
-            return self.filter(request, filters, excludes, top, bottom, order_by)
+                response = self.cached_response(cached_data)
+            else:
+                try:
+                    response = self.filter(
+                        request, filters, excludes, top, bottom, order_by
+                    )
+                finally:
+                    self.release_rebuild_lock()
+            return self.set_validators(response, etag, last_modified)
         except ValidationError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     def retrieve(self, request, pk=None):
         if "retrieve" not in self.allowed_methods:
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
-        
+
         self.crud_middleware(request)
+        self.use_read_replica()
+        self.parse_fieldset(request)
+        # object cache entries always hold the full representation
+        use_cache = self.cache_key_prefix and not self.has_fieldset()
+
+        etag, last_modified = self.get_object_validators(pk)
+        not_modified = self.get_not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
 
         cached_object = None
-        if self.cache_key_prefix:
+        if use_cache:
             cache_key = self.get_object_cache_key(pk)
-            cached_object = cache.get(cache_key)
+            cached_object = self.get_cached(cache_key, self.get_local_object_duration())
+            if cached_object is None:
+                cached_object = self.wait_for_rebuild(
+                    cache_key, self.get_object_cache_key(pk, stale=True)
+                )
         if cached_object:
-            return Response(cached_object, status=status.HTTP_200_OK)
-
-        object = self.get_serialized_object(pk)
-        self.cache_object(object, pk)
-        return Response(object, status=status.HTTP_200_OK)
+            response = self.cached_response(cached_object)
+        else:
+            try:
+                object = self.get_serialized_object(pk)
+                if use_cache:
+                    response = self.cached_response(self.cache_object(object, pk))
+                else:
+                    response = Response(object, status=status.HTTP_200_OK)
+            finally:
+                self.release_rebuild_lock()
+        return self.set_validators(response, etag, last_modified)
 
     @transaction.atomic
     def create(self, request):
         if "create" not in self.allowed_methods:
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
-        
+
         self.crud_middleware(request)
         self.pre_create(request)
 
-        serializer = self.serializer_class(data=request.data, context=self.serializer_context)
+        serializer = self.serializer_class(
+            data=request.data, context=self.serializer_context
+        )
         if serializer.is_valid():
-            instance = serializer.save()
+            try:
+                instance = serializer.save()
+            except DjangoValidationError as e:
+                return self.model_error_response(e)
             self.cache_object(serializer.data, instance.pk)
-            self.invalidate_list_cache()
+            self.invalidate_list_cache([instance])
 
             self.post_create(request, instance)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -135,11 +358,16 @@ class GenericView(viewsets.ViewSet):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
-        serializer = self.serializer_class(instance, data=request.data, partial=True, context=self.serializer_context)
+        serializer = self.serializer_class(
+            instance, data=request.data, partial=True, context=self.serializer_context
+        )
         if serializer.is_valid():
-            serializer.save()
+            try:
+                serializer.save()
+            except DjangoValidationError as e:
+                return self.model_error_response(e)
             self.cache_object(serializer.data, pk)
-            self.invalidate_list_cache()
+            self.invalidate_list_cache([instance])
 
             self.post_update(request, instance)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -154,7 +382,7 @@ class GenericView(viewsets.ViewSet):
 
         instance = get_object_or_404(self.queryset, pk=pk)
         self.delete_cache(pk)
-        self.invalidate_list_cache()
+        self.invalidate_list_cache([instance])
         self.pre_destroy(instance)
         if hasattr(instance, "removed"):
             instance.removed = True
@@ -165,7 +393,268 @@ class GenericView(viewsets.ViewSet):
         self.post_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    # Bulk operations
+    @transaction.atomic
+    def bulk_create(self, request):
+        if "bulk_create" not in self.allowed_methods:
+            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.crud_middleware(request)
+        items = request.data
+        error = self.validate_bulk_items(items)
+        if error:
+            return error
+
+        self.pre_create(request)
+        serializer = self.serializer_class(
+            data=items, many=True, context=self.serializer_context
+        )
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        model = self.queryset.model
+        if self.can_bulk_write(serializer.validated_data):
+            instances = model._default_manager.bulk_create(
+                [model(**attrs) for attrs in serializer.validated_data]
+            )
+            invalidate_dependents(model, [instance.pk for instance in instances])
+        else:
+            instances, errors = self.save_each(
+                lambda index: serializer.child.create(serializer.validated_data[index]),
+                len(items),
+            )
+            if errors:
+                return errors
+
+        data = self.serialize_bulk(instances)
+        self.cache_objects(data)
+        self.invalidate_list_cache(instances)
+
+        for instance in instances:
+            self.post_create(request, instance)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @transaction.atomic
+    def bulk_update(self, request):
+        if "bulk_update" not in self.allowed_methods:
+            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.crud_middleware(request)
+        items = request.data
+        error = self.validate_bulk_items(items)
+        if error:
+            return error
+
+        pk_field = self.queryset.model._meta.pk
+        pks = []
+        for item in items:
+            try:
+                pks.append(pk_field.to_python(item.get("id")))
+            except DjangoValidationError:
+                pks.append(None)
+        instances = self.queryset.in_bulk([pk for pk in pks if pk is not None])
+
+        serializers_ = []
+        errors = []
+        for item, pk in zip(items, pks):
+            instance = instances.get(pk)
+            if instance is None:
+                errors.append({"id": ["Object not found"]})
+                continue
+            disallowed = [
+                field
+                for field in item
+                if field != "id"
+                and "*" not in self.allowed_update_fields
+                and field not in self.allowed_update_fields
+            ]
+            if disallowed:
+                errors.append(
+                    {field: ["Field is not allowed to update"] for field in disallowed}
+                )
+                continue
+
+            self.pre_update(request, instance)
+            serializer = self.serializer_class(
+                instance, data=item, partial=True, context=self.serializer_context
+            )
+            serializers_.append(serializer)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+
+        if any(errors):
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        updated = [serializer.instance for serializer in serializers_]
+        if self.can_bulk_write([s.validated_data for s in serializers_]):
+            fields = set()
+            for serializer in serializers_:
+                for attr, value in serializer.validated_data.items():
+                    setattr(serializer.instance, attr, value)
+                    fields.add(attr)
+            now = timezone.now()
+            for field in self.queryset.model._meta.concrete_fields:
+                if getattr(field, "auto_now", False):
+                    for instance in updated:
+                        setattr(instance, field.attname, now)
+                    fields.add(field.name)
+            self.queryset.model._default_manager.bulk_update(updated, list(fields))
+            invalidate_dependents(
+                self.queryset.model, [instance.pk for instance in updated]
+            )
+        else:
+            _, errors = self.save_each(
+                lambda index: serializers_[index].save(), len(serializers_)
+            )
+            if errors:
+                return errors
+
+        data = self.serialize_bulk(updated)
+        self.cache_objects(data)
+        self.invalidate_list_cache(updated)
+
+        for instance in updated:
+            self.post_update(request, instance)
+        return Response(data, status=status.HTTP_200_OK)
+
+    @transaction.atomic
+    def bulk_destroy(self, request):
+        if "bulk_delete" not in self.allowed_methods:
+            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        self.crud_middleware(request)
+        ids = (
+            request.data.get("ids") if isinstance(request.data, dict) else request.data
+        )
+        if not ids and request.query_params.get("ids"):
+            ids = request.query_params["ids"].split(",")
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {"error": "Expected a list of ids"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > self.bulk_max_size:
+            return Response(
+                {"error": f"At most {self.bulk_max_size} objects per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            pks = [self.queryset.model._meta.pk.to_python(pk) for pk in ids]
+        except DjangoValidationError as e:
+            return Response({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        instances = self.queryset.in_bulk(pks)
+        missing = [pk for pk in pks if pk not in instances]
+        if missing:
+            return Response(
+                {"error": "Objects not found", "ids": missing},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        self.delete_cache_many(pks)
+        self.invalidate_list_cache(list(instances.values()))
+        for instance in instances.values():
+            self.pre_destroy(instance)
+
+        model = self.queryset.model
+        queryset = model._default_manager.filter(pk__in=pks)
+        if hasattr(model, "removed"):
+            if self.can_bulk_write([]):
+                queryset.update(removed=True)
+                invalidate_dependents(model, pks)
+            else:
+                for instance in instances.values():
+                    instance.removed = True
+                    instance.save(update_fields=["removed"])
+        elif model.delete is models.Model.delete:
+            queryset.delete()
+        else:
+            for instance in instances.values():
+                instance.delete()
+
+        for instance in instances.values():
+            self.post_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def model_error_response(self, error):
+        """
+        400 response for a ValidationError raised by Model.save() (e.g. a booking conflict),
+        rolling back whatever the request wrote before it
+        """
+        transaction.set_rollback(True)
+        return Response({"error": error.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+    def validate_bulk_items(self, items):
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Expected a list of objects"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.bulk_max_size:
+            return Response(
+                {"error": f"At most {self.bulk_max_size} objects per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not all(isinstance(item, dict) for item in items):
+            return Response(
+                {"error": "Expected a list of objects"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return None
+
+    def can_bulk_write(self, validated_items):
+        """
+        bulk_create/bulk_update skip Model.save() and save signals,
+        so they are only used for models that rely on neither
+        (cache dependencies are invalidated by the bulk operations themselves).
+        """
+        model = self.queryset.model
+        if model.save is not models.Model.save:
+            return False
+        if has_other_receivers(pre_save, model) or has_other_receivers(
+            post_save, model
+        ):
+            return False
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        return not any(many_to_many & set(attrs) for attrs in validated_items)
+
+    def save_each(self, save, count):
+        """
+        Save items one by one inside the request transaction.
+        Returns (instances, error response); the transaction is rolled back on the first failure.
+        """
+        instances = []
+        for index in range(count):
+            try:
+                instances.append(save(index))
+            except (DjangoValidationError, IntegrityError, ValueError) as e:
+                transaction.set_rollback(True)
+                errors = [{} for _ in range(count)]
+                messages = e.messages if hasattr(e, "messages") else [str(e)]
+                errors[index] = {"non_field_errors": messages}
+                return instances, Response(
+                    {"errors": errors}, status=status.HTTP_400_BAD_REQUEST
+                )
+        return instances, None
+
+    def serialize_bulk(self, instances):
+        pks = [instance.pk for instance in instances]
+        objects = self.annotate_queryset(
+            self.optimize_queryset(self.queryset.filter(pk__in=pks))
+        ).in_bulk()
+        objects = [objects.get(instance.pk, instance) for instance in instances]
+        serializer = self.get_serializer(objects, many=True)
+        if self.annotations:
+            attach_annotations(
+                serializer, self.annotations, self.get_annotated_fields(), objects
+            )
+        return serializer.data
+
     # Middleware methods
+    def perform_authentication(self, request):
+        with timer("auth"):
+            super().perform_authentication(request)
+
     def pre_create(self, request):
         pass
 
@@ -185,32 +674,562 @@ class GenericView(viewsets.ViewSet):
         pass
 
     # Cache operations
+    def get_local_object_duration(self):
+        """
+        Seconds object entries are kept in process memory. Scoped object keys move with the
+        generation, but global ones are deleted on write, which other processes only learn
+        through the invalidation broadcast: without one they are not kept locally.
+        """
+        if self.cache_scope != self.SCOPE_GLOBAL or invalidations_are_broadcast():
+            return self.local_cache_duration
+        return 0
+
+    def get_cached(self, cache_key, local_duration=None):
+        if local_duration is None:
+            local_duration = self.local_cache_duration
+        if local_duration:
+            data = local_get(cache_key, local_duration)
+        else:
+            data = cache.get(cache_key)
+        record_cache_lookup(data is not None)
+        return data
+
+    def get_cached_many(self, cache_keys, local_duration=None):
+        if local_duration is None:
+            local_duration = self.local_cache_duration
+        if local_duration:
+            found = local_get_many(cache_keys, local_duration)
+        else:
+            found = cache.get_many(cache_keys)
+        for cache_key in cache_keys:
+            record_cache_lookup(cache_key in found)
+        return found
+
+    def set_cached(self, cache_key, data, timeout, local_duration=None):
+        if local_duration is None:
+            local_duration = self.local_cache_duration
+        timeout = self.get_cache_timeout(timeout)
+        cache.set(cache_key, data, timeout)
+        if local_duration:
+            process_cache.set(cache_key, data, min(timeout, local_duration))
+
+    def wait_for_rebuild(self, cache_key, stale_key):
+        """
+        Single-flight rebuild of a missing cache entry.
+        Returns data to serve, or None when this request should rebuild the entry:
+        the first request takes a short lock and rebuilds, the others serve the stale copy
+        (see stale_while_revalidate) or, without one, rebuild as well. They never sleep:
+        under ASGI every sync view shares one thread, so waiting would stall all of them.
+        """
+        lock_key = f"{cache_key}_lock"
+        if cache.add(lock_key, 1, self.cache_lock_timeout):
+            self.rebuild_lock = lock_key
+            return None
+
+        if self.stale_while_revalidate:
+            stale = self.get_cached(stale_key)
+            if stale is not None:
+                self.served_stale = True
+                return stale
+        # the rebuild may have finished since the first lookup
+        return cache.get(cache_key)
+
+    def release_rebuild_lock(self):
+        if self.rebuild_lock:
+            cache.delete(self.rebuild_lock)
+            self.rebuild_lock = None
+
     def delete_cache(self, pk):
-        if not self.cache_key_prefix:
+        """
+        Drop the cached object; scoped entries are dropped by invalidate_list_cache() instead
+        """
+        if not self.cache_key_prefix or self.cache_scope != self.SCOPE_GLOBAL:
             return
-        cache_key = self.get_object_cache_key(pk)
-        cache.delete(cache_key)
+        cache.delete_many(
+            [self.get_object_cache_key(pk), self.get_object_cache_key(pk, stale=True)]
+        )
+        if self.local_cache_duration:
+            local_invalidate([self.get_object_cache_key(pk)])
+
+    def delete_cache_many(self, pks):
+        if not self.cache_key_prefix or self.cache_scope != self.SCOPE_GLOBAL:
+            return
+        cache.delete_many(
+            [self.get_object_cache_key(pk) for pk in pks]
+            + [self.get_object_cache_key(pk, stale=True) for pk in pks]
+        )
+        if self.local_cache_duration:
+            local_invalidate([self.get_object_cache_key(pk) for pk in pks])
 
-    def invalidate_list_cache(self):
+    def invalidate_list_cache(self, instances=None):
+        """
+        Bump the list generation; entries cached under older generations are never read again
+        and expire with cache_duration.
+        For scoped views only the scopes affected by `instances` are bumped when they are known.
+        """
         if not self.cache_key_prefix:
             return
-        cache.delete_pattern(f"{self.cache_key_prefix}_list_*")
+        scopes = self.get_invalidation_scopes(instances) if instances else None
+        self.invalidate_cache_scopes(scopes)
+        self.list_generation = None
+
+    @classmethod
+    def invalidate_cache_scopes(cls, scopes=None):
+        """
+        Bump the generation of each scope in `scopes` (e.g. from a signal handler),
+        or the global generation, which evicts every scope, when `scopes` is None.
+        """
+        if not cls.cache_key_prefix:
+            return
+        if scopes is None:
+            keys = [cls.get_list_generation_key()]
+            bump_generation(keys[0])
+        else:
+            keys = [cls.get_list_generation_key(scope) for scope in set(scopes)]
+            for key in keys:
+                bump_generation(key, cls.get_scope_generation_timeout())
+        mark_written(keys)
+
+    @classmethod
+    def get_list_generation_key(cls, scope=None):
+        if scope is None:
+            return f"{cls.cache_key_prefix}_list_generation"
+        return f"{cls.cache_key_prefix}_list_generation_{scope}"
+
+    @classmethod
+    def get_scope_generation_timeout(cls):
+        # nothing cached under a scope outlives its entries, so the counter may expire with them
+        return cls.cache_duration + cls.stale_while_revalidate
+
+    def get_list_generation(self):
+        """
+        Generation segment of list (and scoped object) keys: the global generation,
+        followed by the scope's own generation for scoped views
+        """
+        if self.list_generation is None:
+            generation = self.read_generation(self.get_list_generation_key())
+            if self.cache_scope != self.SCOPE_GLOBAL:
+                scope_generation = self.read_generation(
+                    self.get_list_generation_key(self.get_cache_scope()),
+                    self.get_scope_generation_timeout(),
+                )
+                generation = f"{generation}.{scope_generation}"
+            self.list_generation = generation
+        return self.list_generation
+
+    def read_generation(self, key, timeout=None):
+        # never kept locally: keys built from a fresh generation cannot return stale
+        # entries, whether or not the process got the invalidation broadcast
+        return get_generation(key, timeout)
+
+    def cache_list(self, cache_key, data, stale_key=None):
+        """
+        Cache the rendered list response; returns the RenderedEntry
+        """
+        if not self.cache_key_prefix:
+            return None
+        entry = RenderedEntry.render(data, self.cache_gzip_min_size)
+        self.set_cached(cache_key, entry, self.cache_duration)
+        if stale_key and self.stale_while_revalidate:
+            cache.set(
+                stale_key,
+                entry,
+                self.get_cache_timeout(self.cache_duration)
+                + self.stale_while_revalidate,
+            )
+        return entry
 
     def cache_object(self, object_data, pk):
+        """
+        Cache the rendered object; returns the RenderedEntry
+        """
         if not self.cache_key_prefix:
-            return
+            return None
+        entry = RenderedEntry.render(object_data)
         cache_key = self.get_object_cache_key(pk)
-        cache.set(cache_key, object_data, self.cache_duration)
+        self.set_cached(
+            cache_key, entry, self.cache_duration, self.get_local_object_duration()
+        )
+        if self.stale_while_revalidate and self.cache_scope == self.SCOPE_GLOBAL:
+            cache.set(
+                self.get_object_cache_key(pk, stale=True),
+                entry,
+                self.get_cache_timeout(self.cache_duration)
+                + self.stale_while_revalidate,
+            )
+        return entry
+
+    def cache_objects(self, objects_data):
+        """
+        Cache several rendered objects; returns their RenderedEntry list
+        """
+        if not self.cache_key_prefix:
+            return None
+        rendered = [RenderedEntry.render(data) for data in objects_data]
+        entries = {
+            self.get_object_cache_key(data["id"]): entry
+            for data, entry in zip(objects_data, rendered)
+        }
+        timeout = self.get_cache_timeout(self.cache_duration)
+        cache.set_many(entries, timeout)
+        local_duration = self.get_local_object_duration()
+        if local_duration:
+            for cache_key, entry in entries.items():
+                process_cache.set(cache_key, entry, min(timeout, local_duration))
+        if self.stale_while_revalidate and self.cache_scope == self.SCOPE_GLOBAL:
+            cache.set_many(
+                {
+                    self.get_object_cache_key(data["id"], stale=True): entry
+                    for data, entry in zip(objects_data, rendered)
+                },
+                timeout + self.stale_while_revalidate,
+            )
+        return rendered
+
+    def cached_response(self, entry):
+        """
+        Response for a cached entry: the stored bytes as they are when the client negotiated JSON
+        (answering If-None-Match with 304), otherwise the decoded data for the negotiated renderer
+        """
+        if not isinstance(entry, RenderedEntry):
+            # entry cached before responses were stored rendered
+            return Response(entry, status=status.HTTP_200_OK)
+        if not isinstance(self.request.accepted_renderer, JSONRenderer):
+            return Response(entry.data(), status=status.HTTP_200_OK)
+        response = entry.to_response(self.request)
+        if not self.conditional_requests:
+            response = get_conditional_response(
+                self.request, etag=entry.etag, response=response
+            )
+        return response
+
+    def get_object_cache_key(self, pk, stale=False):
+        """
+        Global views key objects by pk and delete them on write.
+        Scoped views key them by scope and generation, so invalidating a scope evicts them too
+        (no stale copies are kept for scoped objects).
+        """
+        period = self.get_period_segment()
+        if self.cache_scope != self.SCOPE_GLOBAL:
+            return (
+                f"{self.cache_key_prefix}_object_{period}{self.get_cache_scope()}_"
+                f"{self.get_list_generation()}_{pk}"
+            )
+        if stale:
+            return f"{self.cache_key_prefix}_object_stale_{period}{pk}"
+        return f"{self.cache_key_prefix}_object_{period}{pk}"
+
+    def get_count_cache_key(self, queryset):
+        if self.cache_key_prefix:
+            # writes through the view move the generation and so refresh the count
+            return (
+                f"{self.cache_key_prefix}_count_{self.get_list_generation()}_"
+                f"{get_query_signature(queryset)}"
+            )
+        prefix = queryset.model._meta.label_lower
+        return f"{prefix}_count_{get_query_signature(queryset)}"
+
+    def get_list_params(self, filters, excludes, top, bottom, order_by):
+        """
+        Everything that selects the content of a list response
+        """
+        return {
+            "filters": filters,
+            "excludes": excludes,
+            "top": top,
+            "bottom": bottom,
+            "order_by": order_by,
+            "cursor": self.cursor,
+            "count": self.count_strategy,
+            "fields": self.requested_fields,
+            "omit": self.omitted_fields,
+        }
+
+    def get_list_cache_key(self, filters, excludes, top, bottom, order_by, stale=False):
+        """
+        Key of the current list entry, or with `stale=True` the generation-independent key
+        of the last copy stored for these parameters (served while a rebuild runs)
+        """
+        digest = get_params_digest(
+            self.get_list_params(filters, excludes, top, bottom, order_by)
+        )
+        generation = "stale" if stale else self.get_list_generation()
+        return (
+            f"{self.cache_key_prefix}_list_{generation}_"
+            f"{self.get_period_segment()}{self.get_cache_scope()}_{digest}"
+        )
+
+    def get_cache_scope(self):
+        """
+        Scope segment of cache keys, from cache_scope
+        """
+        if self.cache_scope == self.SCOPE_USER:
+            return self.get_user_scope(self.request.user.pk)
+        if self.cache_scope == self.SCOPE_ROLE:
+            return f"role_{self.get_user_role(self.request.user)}"
+        return "global"
+
+    def get_cache_period(self):
+        """
+        (index, start, end) datetimes of the current cache_period, fixed for the whole request
+        so that the keys read and written by one request agree; None without cache_period
+        """
+        if not self.cache_period:
+            return None
+        if self.current_period is None:
+            index = int(time.time() // self.cache_period)
+            start = datetime.datetime.fromtimestamp(
+                index * self.cache_period, tz=datetime.timezone.utc
+            )
+            end = start + datetime.timedelta(seconds=self.cache_period)
+            self.current_period = (index, start, end)
+        return self.current_period
+
+    def get_period_segment(self):
+        period = self.get_cache_period()
+        return f"p{period[0]}_" if period else ""
+
+    def get_cache_timeout(self, timeout):
+        """
+        `timeout`, shortened so that entries expire with the current cache period
+        """
+        period = self.get_cache_period()
+        if period is None:
+            return timeout
+        remaining = math.ceil((period[2] - timezone.now()).total_seconds())
+        return max(min(timeout, remaining), 1)
+
+    def get_generation_last_modified(self, last_modified):
+        """
+        `last_modified`, moved forward to the last bump of the list generation:
+        writes to embedded related rows only bump the generation (cache dependencies)
+        """
+        if not self.cache_key_prefix or last_modified is None:
+            return last_modified
+        modified = get_generation_modified(self.get_list_generation_key())
+        if self.cache_scope != self.SCOPE_GLOBAL:
+            modified = max(
+                modified,
+                get_generation_modified(
+                    self.get_list_generation_key(self.get_cache_scope()),
+                    self.get_scope_generation_timeout(),
+                ),
+            )
+        return max(
+            last_modified,
+            datetime.datetime.fromtimestamp(modified, tz=datetime.timezone.utc),
+        )
+
+    def get_period_last_modified(self, last_modified):
+        # payloads of a new period differ from the previous one's
+        period = self.get_cache_period()
+        if period is None or last_modified is None:
+            return last_modified
+        return max(last_modified, period[1])
+
+    @staticmethod
+    def get_user_scope(user_id):
+        return f"user_{user_id}" if user_id is not None else "anonymous"
+
+    def get_user_role(self, user):
+        if not user.is_authenticated:
+            return "anonymous"
+        if user.is_staff:
+            return "staff"
+        for role in ("barber_shop", "specialist", "customer"):
+            if getattr(user, f"is_{role}", False):
+                return role
+        return "user"
+
+    def get_invalidation_scopes(self, instances):
+        """
+        Scopes whose entries a write to `instances` affects, or None to invalidate every scope.
+        User scoped views resolve them through cache_scope_users.
+        """
+        if self.cache_scope != self.SCOPE_USER or not self.cache_scope_users:
+            return None
+
+        scopes = set()
+        for instance in instances:
+            for path in self.cache_scope_users:
+                value = instance
+                for attr in path.split("."):
+                    value = getattr(value, attr, None)
+                    if value is None:
+                        break
+                if value is not None:
+                    scopes.add(self.get_user_scope(value))
+        return scopes
+
+    @classmethod
+    def get_scope_user_lookups(cls):
+        """
+        cache_scope_users as query lookups (`appointment.customer.user_id` -> `appointment__customer__user_id`)
+        """
+        if cls.cache_scope != cls.SCOPE_USER:
+            return []
+        return [path.replace(".", "__") for path in cls.cache_scope_users]
+
+    @classmethod
+    def get_cache_dependencies(cls):
+        """
+        (lookup, model, field) relation paths to every model embedded in the payload:
+        the serializer's nesting, select_related_fields, prefetch_related_fields and cache_dependencies
+        """
+        lookups = list(cls.cache_dependencies)
+        for extra in (cls.select_related_fields, cls.prefetch_related_fields):
+            if isinstance(extra, dict):
+                extra = [
+                    lookup
+                    for field_lookups in extra.values()
+                    for lookup in field_lookups
+                ]
+            lookups.extend(
+                getattr(lookup, "prefetch_through", lookup) for lookup in extra
+            )
+        return get_relation_paths(cls.serializer_class(), cls.queryset.model, lookups)
 
-    def get_object_cache_key(self, pk):
-        return f"{self.cache_key_prefix}_object_{pk}"
+    @classmethod
+    def invalidate_dependents(cls, pks, user_ids=None):
+        """
+        Evict the objects `pks` and the list entries that may contain them
+        after data embedded in their payloads changed outside the view
+        """
+        cls().delete_cache_many(pks)
+        scopes = None
+        if cls.get_scope_user_lookups():
+            scopes = [cls.get_user_scope(user_id) for user_id in user_ids or ()]
+        cls.invalidate_cache_scopes(scopes)
 
-    def get_list_cache_key(self, filters, excludes, top, bottom, order_by):
+    # Read replicas
+    def use_read_replica(self):
+        """
+        Route this request's reads to a replica, unless the client wrote recently (it must
+        read its own writes) or the view's cache was just invalidated (a lagging replica
+        would be cached for the whole cache_duration)
+        """
+        if not self.replica_reads or self.read_replica is not None:
+            return
+        if is_pinned(self.request):
+            return
+        if self.cache_key_prefix:
+            keys = [self.get_list_generation_key()]
+            if self.cache_scope != self.SCOPE_GLOBAL:
+                keys.append(self.get_list_generation_key(self.get_cache_scope()))
+            if was_written(keys):
+                return
+        self.read_replica = route_reads_to_replica()
+
+    def release_read_replica(self):
+        if self.read_replica is not None:
+            release_replica(self.read_replica)
+            self.read_replica = None
+
+    # Conditional requests
+    def get_last_modified_field(self):
+        if not self.conditional_requests:
+            return None
+        model = self.queryset.model
+        try:
+            field = model._meta.get_field(self.last_modified_field)
+        except FieldDoesNotExist:
+            return None
+        return field.name
+
+    def get_list_validators(self, filters, excludes, top, bottom, order_by):
+        """
+        Returns (etag, last_modified) for a list request, from one aggregate query:
+        the newest modification time and row count of the filtered rows,
+        plus the request parameters and the list cache generation (and its last bump time).
+        """
+        field = self.get_last_modified_field()
+        if field is None:
+            return None, None
+
+        stats = (
+            self.queryset.filter(Q(**filters))
+            .exclude(Q(**excludes))
+            .order_by()
+            .aggregate(last_modified=Max(field), count=Count("pk"))
+        )
+        validator = {
+            "params": self.get_list_params(filters, excludes, top, bottom, order_by),
+            "scope": self.get_cache_scope(),
+            "last_modified": stats["last_modified"],
+            "count": stats["count"],
+        }
+        if self.cache_key_prefix:
+            validator["generation"] = self.get_list_generation()
+        if self.cache_period:
+            validator["period"] = self.get_period_segment()
+        last_modified = self.get_generation_last_modified(stats["last_modified"])
         return (
-            f"{self.cache_key_prefix}_list_{hash(frozenset(filters.items()))}_"
-            f"{hash(frozenset(excludes.items()))}_{top}_{bottom}_{order_by}"
+            quote_etag(get_params_digest(validator)),
+            self.get_period_last_modified(last_modified),
         )
 
+    def get_object_validators(self, pk):
+        """
+        Returns (etag, last_modified) for a retrieve request from the row's modification time,
+        plus the list cache generation when `cache_key_prefix` is set
+        """
+        field = self.get_last_modified_field()
+        if field is None:
+            return None, None
+
+        try:
+            last_modified = (
+                self.queryset.filter(pk=pk).values_list(field, flat=True).first()
+            )
+        except (ValueError, DjangoValidationError):
+            return None, None
+        if last_modified is None:
+            return None, None
+
+        validator = {
+            "pk": str(pk),
+            "scope": self.get_cache_scope(),
+            "last_modified": last_modified,
+            "fields": self.requested_fields,
+            "omit": self.omitted_fields,
+        }
+        if self.cache_key_prefix:
+            # bumped when related rows embedded in the payload change
+            validator["generation"] = self.get_list_generation()
+        if self.cache_period:
+            validator["period"] = self.get_period_segment()
+        last_modified = self.get_generation_last_modified(last_modified)
+        return (
+            quote_etag(get_params_digest(validator)),
+            self.get_period_last_modified(last_modified),
+        )
+
+    def get_not_modified_response(self, request, etag, last_modified):
+        """
+        304 response when the client's copy is still current, otherwise None
+        """
+        if etag is None:
+            return None
+        response = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+        )
+        if response is None:
+            return None
+        return self.set_validators(response, etag, last_modified)
+
+    def set_validators(self, response, etag, last_modified):
+        if etag is None or not (200 <= response.status_code < 300):
+            return response
+        if self.served_stale:
+            # the stale copy predates the data the validators describe
+            return response
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
     # Helper methods
     def parse_query_params(self, request):
         filters = {}
@@ -228,7 +1247,13 @@ class GenericView(viewsets.ViewSet):
             except json.JSONDecodeError:
                 return value  # Return as plain string if not valid JSON
 
+        self.parse_fieldset(request)
+        self.export_format = request.query_params.get("export")
+        self.batch_ids = request.query_params.get("ids")
+
         for key, value in request.query_params.items():
+            if key in ("fields", "omit", "export", "ids"):
+                continue
             if key.startswith("exclude__"):
                 parsed_value = parse_value(value)
                 excludes[key[9:]] = parsed_value
@@ -242,10 +1267,36 @@ class GenericView(viewsets.ViewSet):
 
         return filters, excludes
 
+    def parse_fieldset(self, request):
+        fields = request.query_params.get("fields")
+        omit = request.query_params.get("omit")
+        self.requested_fields = parse_fieldset(fields) if fields else None
+        self.omitted_fields = parse_fieldset(omit) if omit else None
+
+    def has_fieldset(self):
+        return bool(self.requested_fields or self.omitted_fields)
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Read serializer for this request, pruned to the requested fieldset
+        """
+        kwargs.setdefault("context", self.serializer_context)
+        serializer = self.serializer_class(*args, **kwargs)
+        if self.has_fieldset():
+            prune_fields(serializer, self.requested_fields, self.omitted_fields)
+        if self.annotations:
+            read_annotations(serializer, self.get_annotated_fields())
+        return serializer
+
     def get_pagination_params(self, filters):
         page = filters.pop("page", None)
         top = int(filters.pop("top", 0))
         order_by = filters.pop("order_by", None)
+        filters.pop("cursor", None)
+        if filters.pop("count", None) == self.COUNT_NONE:
+            self.count_strategy = self.COUNT_NONE
+        if self.cursor_pagination:
+            self.cursor = self.request.query_params.get("cursor")
 
         if page is not None:
             top = (int(page) - 1) * self.size_per_request
@@ -257,48 +1308,345 @@ class GenericView(viewsets.ViewSet):
     def filter_queryset(self, filters, excludes):
         filter_q = Q(**filters)
         exclude_q = Q(**excludes)
-        return self.queryset.filter(filter_q).exclude(exclude_q)
+        return self.read_queryset(self.queryset.filter(filter_q).exclude(exclude_q))
+
+    @classmethod
+    def get_query_plan(cls):
+        """
+        select_related/prefetch_related plan for serializer_class, built once per view class
+        """
+        plan = cls.__dict__.get("_query_plan")
+        if plan is None:
+            cls._query_plan = plan = cls.build_query_plan(cls.serializer_class())
+        return plan
+
+    @classmethod
+    def build_query_plan(cls, serializer):
+        def extra_lookups(lookups):
+            if not isinstance(lookups, dict):
+                return lookups
+            fields = serializer.fields
+            return [
+                lookup
+                for name, field_lookups in lookups.items()
+                if name in fields
+                for lookup in field_lookups
+            ]
+
+        return build_query_plan(
+            serializer if cls.auto_query_plan else None,
+            cls.queryset.model,
+            select_related=extra_lookups(cls.select_related_fields),
+            prefetch_related=extra_lookups(cls.prefetch_related_fields),
+        )
+
+    def optimize_queryset(self, queryset):
+        if not self.has_fieldset():
+            return self.get_query_plan().apply(queryset)
+
+        # plan and columns for the pruned serializer only
+        serializer = self.get_serializer()
+        queryset = self.build_query_plan(serializer).apply(queryset)
+        deferred = get_deferrable_fields(serializer, queryset.model)
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+    def get_annotated_fields(self):
+        """
+        Paths of the annotated fields in this request's fieldset
+        """
+        if not self.has_fieldset():
+            names = type(self).__dict__.get("_annotated_fields")
+            if names is None:
+                serializer = self.serializer_class()
+                names = type(self)._annotated_fields = [
+                    name
+                    for name in self.annotations
+                    if has_annotated_field(serializer, name)
+                ]
+            return names
+        serializer = self.serializer_class(context=self.serializer_context)
+        prune_fields(serializer, self.requested_fields, self.omitted_fields)
+        return [
+            name for name in self.annotations if has_annotated_field(serializer, name)
+        ]
+
+    def annotate_queryset(self, queryset):
+        if not self.annotations:
+            return queryset
+        names = [name for name in self.get_annotated_fields() if not is_nested(name)]
+        return queryset.annotate(**resolve_annotations(self.annotations, names))
+
+    def get_projection(self):
+        """
+        Compiled values() projection for this request's fieldset,
+        or None when fast_read is off or the serializer needs model instances.
+        Projections are compiled once per view class and fieldset.
+        """
+        if not self.fast_read:
+            return None
+
+        annotations = sorted(self.queryset.query.annotations)
+        if self.annotations:
+            annotations += sorted(
+                get_annotation_alias(name)
+                for name in self.get_annotated_fields()
+                if not is_nested(name)
+            )
+        key = get_params_digest(
+            {
+                "fields": self.requested_fields,
+                "omit": self.omitted_fields,
+                "annotations": annotations,
+            }
+        )
+        projections = type(self).__dict__.get("_projections")
+        if projections is None:
+            projections = type(self)._projections = {}
+        if key not in projections:
+            projections[key] = compile_projection(
+                self.get_serializer(), self.queryset.model, annotations
+            )
+        return projections[key]
+
+    def read_queryset(self, queryset):
+        """
+        Queryset whose rows are passed to serialize()
+        """
+        queryset = self.annotate_queryset(queryset)
+        projection = self.get_projection()
+        if projection is not None:
+            return projection.apply(queryset)
+        return self.optimize_queryset(queryset)
+
+    def serialize(self, data, many=False):
+        """
+        Representation of rows from read_queryset()
+        """
+        with timer("serialize"):
+            projection = self.get_projection()
+            if projection is not None:
+                if many:
+                    return projection.represent_many(data)
+                return projection.represent(data)
+            serializer = self.get_serializer(data, many=many)
+            if self.annotations:
+                attach_annotations(
+                    serializer,
+                    self.annotations,
+                    self.get_annotated_fields(),
+                    data if many else [data],
+                )
+            return serializer.data
 
     def filter(self, request, filters, excludes, top, bottom, order_by=None):
         queryset = self.filter_queryset(filters, excludes)
 
-        if order_by:
-            queryset = queryset.order_by(order_by)
-
-        paginator = Paginator(queryset, self.size_per_request)
-        page_number = (top // self.size_per_request) + 1
-        page = None
-        if bottom is None:
-            page = paginator.get_page(page_number)
+        if self.cursor is not None:
+            data = self.cursor_paginate(queryset, order_by)
         else:
-            page = queryset[top:bottom]
+            if order_by:
+                queryset = queryset.order_by(order_by)
+            data = self.paginate(queryset, top, bottom)
+
+        if self.cache_key_prefix:
+            cache_key = self.get_list_cache_key(
+                filters, excludes, top, bottom, order_by
+            )
+            stale_key = self.get_list_cache_key(
+                filters, excludes, top, bottom, order_by, stale=True
+            )
+            return self.cached_response(self.cache_list(cache_key, data, stale_key))
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def paginate(self, queryset, top, bottom):
+        if self.count_strategy == self.COUNT_NONE:
+            return self.paginate_without_count(queryset, top, bottom)
 
-        serializer = self.serializer_class(page, many=True, context=self.serializer_context)
-        data = None
+        total_count, estimated = self.get_total_count(queryset)
         if bottom is None:
+            paginator = CountedPaginator(queryset, self.size_per_request, total_count)
+            page = paginator.get_page((top // self.size_per_request) + 1)
             data = {
-                "objects": serializer.data,
+                "objects": self.serialize(page, many=True),
                 "total_count": paginator.count,
                 "num_pages": paginator.num_pages,
                 "current_page": page.number,
             }
         else:
             data = {
-                "objects": serializer.data,
-                "total_count": queryset.count(),
+                "objects": self.serialize(queryset[top:bottom], many=True),
+                "total_count": total_count,
             }
+        if estimated:
+            data["total_count_estimated"] = True
+        return data
 
-        cache_key = self.get_list_cache_key(filters, excludes, top, bottom, order_by)
-        cache.set(cache_key, data, self.cache_duration)
+    def paginate_without_count(self, queryset, top, bottom):
+        if bottom is None:
+            bottom = top + self.size_per_request
+        objects = list(queryset[top : bottom + 1])
+        has_more = len(objects) > bottom - top
 
-        return Response(data, status=status.HTTP_200_OK)
+        data = {
+            "objects": self.serialize(objects[: bottom - top], many=True),
+            "has_more": has_more,
+        }
+        if top % self.size_per_request == 0 and bottom - top == self.size_per_request:
+            data["current_page"] = (top // self.size_per_request) + 1
+        return data
+
+    def get_total_count(self, queryset):
+        """
+        Returns (count, estimated) according to count_strategy
+        """
+        if self.count_strategy == self.COUNT_ESTIMATED:
+            estimate = estimate_count(queryset, self.count_estimate_threshold)
+            if estimate is not None:
+                return estimate, True
+
+        if self.count_strategy == self.COUNT_CACHED:
+            cache_key = self.get_count_cache_key(queryset)
+            count = self.get_cached(cache_key)
+            if count is None:
+                count = queryset.count()
+                self.set_cached(cache_key, count, self.count_cache_duration)
+            return count, False
+
+        return queryset.count(), False
+
+    def cursor_paginate(self, queryset, order_by=None):
+        order_by = order_by or self.get_cursor_order_by(queryset)
+        if not isinstance(order_by, str):
+            raise ValidationError("Cursor pagination supports a single order_by field")
+
+        paginator = KeysetPaginator(queryset, order_by, self.size_per_request)
+        objects, next_cursor, prev_cursor = paginator.get_page(self.cursor)
+
+        return {
+            "objects": self.serialize(objects, many=True),
+            "next": next_cursor,
+            "prev": prev_cursor,
+        }
+
+    def get_cursor_order_by(self, queryset):
+        if self.cursor_order_by:
+            return self.cursor_order_by
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        if ordering and isinstance(ordering[0], str):
+            return ordering[0]
+        return "pk"
+
+    def export(self, filters, excludes, order_by=None):
+        """
+        Stream every object matching the filters as NDJSON or CSV.
+        Rows are read with queryset.iterator() and serialized export_chunk_size at a time,
+        so memory use does not grow with the size of the export.
+        """
+        if "export" not in self.allowed_methods:
+            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        if self.export_format not in EXPORT_FORMATS:
+            raise ValidationError(f"export must be one of: {', '.join(EXPORT_FORMATS)}")
+
+        queryset = self.filter_queryset(filters, excludes)
+        if order_by:
+            queryset = queryset.order_by(order_by)
+        # the response is streamed after the request's replica routing ends
+        queryset = queryset.using(queryset.db)
+
+        rows = (
+            self.serialize(chunk, many=True)
+            for chunk in iter_chunks(queryset, self.export_chunk_size)
+        )
+        if self.export_format == "csv":
+            content = render_csv(rows, self.get_serializer())
+        else:
+            content = render_ndjson(rows)
+        if isinstance(self.request._request, ASGIRequest):
+            content = iterate_async(content)
+
+        response = StreamingHttpResponse(
+            content, content_type=EXPORT_FORMATS[self.export_format]
+        )
+        filename = f"{self.queryset.model._meta.model_name}.{self.export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def retrieve_many(self, ids):
+        """
+        Objects for a comma separated list of ids, in the requested order, like one retrieve per id:
+        one cache.get_many for the object entries, one pk__in query for the misses
+        and one cache.set_many for the loaded objects. Unknown ids are listed under `missing`.
+        """
+        if "retrieve" not in self.allowed_methods:
+            return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        pk_field = self.queryset.model._meta.pk
+        try:
+            pks = [pk_field.to_python(pk) for pk in ids.split(",") if pk.strip()]
+        except DjangoValidationError as e:
+            return Response({"error": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+        pks = list(dict.fromkeys(pks))
+        if not pks:
+            return Response(
+                {"error": "Expected a list of ids"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(pks) > self.bulk_max_size:
+            return Response(
+                {"error": f"At most {self.bulk_max_size} objects per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # object cache entries always hold the full representation
+        use_cache = self.cache_key_prefix and not self.has_fieldset()
+        found = {}
+        if use_cache:
+            keys = {self.get_object_cache_key(pk): pk for pk in pks}
+            cached = self.get_cached_many(list(keys), self.get_local_object_duration())
+            for key, pk in keys.items():
+                if key in cached:
+                    found[pk] = cached[key]
+
+        misses = [pk for pk in pks if pk not in found]
+        if misses:
+            rows = list(self.read_queryset(self.queryset.filter(pk__in=misses)))
+            loaded = self.serialize(rows, many=True)
+            if use_cache:
+                loaded = self.cache_objects(loaded)
+            # values() rows of the fast read path carry their pk too
+            for row, data in zip(rows, loaded):
+                found[row["pk"] if isinstance(row, dict) else row.pk] = data
+
+        objects = [found[pk] for pk in pks if pk in found]
+        missing = [pk for pk in pks if pk not in found]
+        if use_cache:
+            entries = [
+                (
+                    entry
+                    if isinstance(entry, RenderedEntry)
+                    else RenderedEntry.render(entry)
+                )
+                for entry in objects
+            ]
+            if isinstance(self.request.accepted_renderer, JSONRenderer):
+                # splice the cached bytes instead of decoding and rendering them again
+                return HttpResponse(
+                    join_objects(entries, {"missing": missing}),
+                    content_type="application/json",
+                )
+            objects = [entry.data() for entry in entries]
+        return Response(
+            {"objects": objects, "missing": missing}, status=status.HTTP_200_OK
+        )
 
     def get_serialized_object(self, pk):
-        instance = get_object_or_404(self.queryset, pk=pk)
-        return self.serializer_class(instance, context=self.serializer_context).data
-    
+        instance = get_object_or_404(self.read_queryset(self.queryset), pk=pk)
+        return self.serialize(instance)
+
     def initialize_queryset(self):
-        if hasattr(self.queryset.model, 'removed'):
+        if hasattr(self.queryset.model, "removed"):
             self.queryset = self.queryset.filter(removed=False)
 
     def crud_middleware(self, request, *args, **kwargs):
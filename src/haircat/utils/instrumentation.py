@@ -0,0 +1,146 @@
+import contextvars
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("haircat.performance")
+
+_current_metrics = contextvars.ContextVar("haircat_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    # RequestMetrics
+    Counters and timings collected while one request is handled.
+
+    **Attributes**
+    - timings: seconds spent per phase (db, serialize, channels, auth)
+    - queries: number of database queries
+    - cache_hits / cache_misses: GenericView cache lookups
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings = {}
+        self.queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        data = {
+            "total_ms": round(self.total() * 1000, 2),
+            "queries": self.queries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+        for name, seconds in self.timings.items():
+            data[f"{name}_ms"] = round(seconds * 1000, 2)
+        return data
+
+    def server_timing(self):
+        entries = [
+            f"total;dur={self.total() * 1000:.1f}",
+            f'db;dur={self.timings.get("db", 0.0) * 1000:.1f};desc="{self.queries} queries"',
+        ]
+        for name, seconds in self.timings.items():
+            if name != "db":
+                entries.append(f"{name};dur={seconds * 1000:.1f}")
+        if self.cache_hits or self.cache_misses:
+            entries.append(
+                f'cache;desc="{self.cache_hits} hits {self.cache_misses} misses"'
+            )
+        return ", ".join(entries)
+
+
+def get_metrics():
+    """
+    Metrics of the request being handled, or None outside ServerTimingMiddleware
+    """
+    return _current_metrics.get()
+
+
+@contextmanager
+def timer(name):
+    """
+    Add the time spent in the block to the current request's `name` timing
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.perf_counter() - started)
+
+
+def record_cache_lookup(hit):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+def _query_timer(execute, sql, params, many, context):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.add_time("db", time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """
+    Collect per-request metrics (queries, DB time, serializer time, cache hits/misses,
+    channel layer sends, authentication) and report them as a `Server-Timing` header
+    and one log line on the `haircat.performance` logger.
+    The header can be turned off with `SERVER_TIMING_HEADER = False`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_query_timer))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+
+        if getattr(settings, "SERVER_TIMING_HEADER", True):
+            response["Server-Timing"] = metrics.server_timing()
+        logger.info(
+            "%s %s %s %s",
+            request.method,
+            request.path,
+            response.status_code,
+            " ".join(f"{key}={value}" for key, value in metrics.as_dict().items()),
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "metrics": metrics.as_dict(),
+            },
+        )
+        return response
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_GROUP = "local_cache_invalidation"
+GROUP_REFRESH = 60 * 60  # seconds between group_add calls (groups expire after a day)
+
+_origin = uuid.uuid4().hex  # this process, to skip its own broadcasts
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    # LocalCache
+    Bounded in-process LRU with per-entry TTLs, kept in front of the shared Django cache.
+    Values are shared by reference: callers must not mutate what they get.
+
+    **Attributes**
+    - max_entries: number of entries kept before the least recently used are dropped
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+process_cache = LocalCache(getattr(settings, "LOCAL_CACHE_MAX_ENTRIES", 1000))
+
+
+def local_get(key, timeout):
+    """
+    Value of `key` from the local tier, else from the shared cache (kept locally for `timeout` seconds).
+    Returns None on a miss in both tiers.
+    """
+    value = process_cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    start_listener()
+    value = cache.get(key)
+    if value is not None:
+        process_cache.set(key, value, timeout)
+    return value
+
+
+def local_get_many(keys, timeout):
+    found = {}
+    missing = []
+    for key in keys:
+        value = process_cache.get(key, _MISSING)
+        if value is _MISSING:
+            missing.append(key)
+        else:
+            found[key] = value
+    if missing:
+        start_listener()
+        shared = cache.get_many(missing)
+        for key, value in shared.items():
+            process_cache.set(key, value, timeout)
+        found.update(shared)
+    return found
+
+
+def local_invalidate(keys):
+    """
+    Drop `keys` from the local tier of this process now and from every other process
+    through the channel layer. Processes that miss the broadcast serve the old value
+    for at most the local timeout.
+    """
+    keys = list(keys)
+    process_cache.delete_many(keys)
+    if not invalidations_are_broadcast():
+        return
+    try:
+        from channels.layers import get_channel_layer
+
+        async_to_sync(get_channel_layer().group_send)(
+            INVALIDATION_GROUP,
+            {"type": "local_cache.invalidate", "keys": keys, "origin": _origin},
+        )
+    except Exception as e:
+        logger.warning("Local cache invalidation broadcast failed: %s", e)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def invalidations_are_broadcast():
+    """
+    Whether local_invalidate() reaches the other processes:
+    the in-memory channel layer does not leave the process
+    """
+    backend = (
+        getattr(settings, "CHANNEL_LAYERS", {}).get("default", {}).get("BACKEND", "")
+    )
+    return bool(backend) and not backend.endswith("InMemoryChannelLayer")
+
+
+def start_listener():
+    """
+    Start the thread applying other processes' invalidations, once per process
+    """
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is not None:
+            return
+        if not invalidations_are_broadcast():
+            _listener = False
+            return
+        _listener = threading.Thread(
+            target=asyncio.run,
+            args=(_listen(),),
+            name="local-cache-invalidation",
+            daemon=True,
+        )
+        _listener.start()
+
+
+async def _listen():
+    from channels.layers import get_channel_layer
+
+    layer = get_channel_layer()
+    while True:
+        try:
+            channel = await layer.new_channel()
+            while True:
+                await layer.group_add(INVALIDATION_GROUP, channel)
+                refresh_at = time.monotonic() + GROUP_REFRESH
+                while time.monotonic() < refresh_at:
+                    try:
+                        message = await asyncio.wait_for(
+                            layer.receive(channel), refresh_at - time.monotonic()
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                    if message.get("origin") != _origin:
+                        process_cache.delete_many(message.get("keys", []))
+        except Exception as e:
+            # while the layer is down local entries expire on their own
+            logger.warning("Local cache invalidation listener failed: %s", e)
+            process_cache.clear()
+            await asyncio.sleep(5)
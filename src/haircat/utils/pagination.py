@@ -0,0 +1,215 @@
+import base64
+import hashlib
+import json
+from types import SimpleNamespace
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import BooleanField, Expression, F, Value
+from rest_framework.exceptions import ValidationError
+
+
+class RowComparison(Expression):
+    """
+    Row value comparison, e.g. `(created_at, id) > (%s, %s)`.
+    Lets the database seek directly into a composite (key, pk) index.
+    """
+
+    conditional = True
+
+    def __init__(self, fields, values, operator):
+        super().__init__(output_field=BooleanField())
+        self.lhs = [F(field.name) for field in fields]
+        self.rhs = [
+            Value(value, output_field=field) for field, value in zip(fields, values)
+        ]
+        self.operator = operator
+
+    def get_source_expressions(self):
+        return [*self.lhs, *self.rhs]
+
+    def set_source_expressions(self, exprs):
+        self.lhs = exprs[: len(self.lhs)]
+        self.rhs = exprs[len(self.lhs) :]
+
+    def as_sql(self, compiler, connection):
+        params = []
+        lhs_sql = []
+        for expr in self.lhs:
+            sql, expr_params = compiler.compile(expr)
+            lhs_sql.append(sql)
+            params.extend(expr_params)
+        rhs_sql = []
+        for expr in self.rhs:
+            sql, expr_params = compiler.compile(expr)
+            rhs_sql.append(sql)
+            params.extend(expr_params)
+        return (
+            f"({', '.join(lhs_sql)}) {self.operator} ({', '.join(rhs_sql)})",
+            params,
+        )
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
+    if not isinstance(payload, dict) or payload.get("d") not in ("n", "p"):
+        raise ValidationError("Invalid cursor")
+    return payload
+
+
+class KeysetPaginator:
+    """
+    # KeysetPaginator
+    Cursor pagination over `(order key, pk)`.
+    Pages are fetched with `WHERE (key, pk) > (...)` instead of OFFSET,
+    so every page costs the same regardless of depth and no COUNT(*) runs.
+
+    **Args**
+    - queryset: filtered queryset
+    - order_by: model field name, optionally prefixed with `-`
+    - size: number of objects per page
+    """
+
+    def __init__(self, queryset, order_by, size):
+        self.queryset = queryset
+        self.size = size
+        self.order_by = order_by
+        self.descending = order_by.startswith("-")
+        self.model = queryset.model
+
+        opts = self.model._meta
+        name = order_by.lstrip("-")
+        try:
+            key_field = opts.pk if name == "pk" else opts.get_field(name)
+        except FieldDoesNotExist:
+            raise ValidationError(f"Cannot paginate by cursor on '{name}'")
+        if not key_field.concrete or key_field.is_relation or key_field.null:
+            raise ValidationError(
+                f"Cursor ordering requires a non-null column, got '{name}'"
+            )
+
+        self.fields = [key_field] if key_field == opts.pk else [key_field, opts.pk]
+
+        if queryset._fields is not None:
+            # values() rows must carry the key columns for the cursors
+            missing = [
+                field.name
+                for field in self.fields
+                if field.name not in queryset._fields
+            ]
+            if missing:
+                self.queryset = queryset.values(*queryset._fields, *missing)
+
+    def get_page(self, cursor=None):
+        """
+        Returns (objects, next_cursor, prev_cursor)
+        """
+        backwards = False
+        queryset = self.queryset
+        if cursor:
+            payload = decode_cursor(cursor)
+            if payload.get("o") != self.order_by:
+                raise ValidationError("Cursor does not match order_by")
+            backwards = payload["d"] == "p"
+            values = self._decode_values(payload.get("v"))
+            forward_operator = "<" if self.descending else ">"
+            backward_operator = ">" if self.descending else "<"
+            queryset = queryset.filter(
+                RowComparison(
+                    self.fields,
+                    values,
+                    backward_operator if backwards else forward_operator,
+                )
+            )
+
+        descending = self.descending != backwards
+        ordering = [f"{'-' if descending else ''}{field.name}" for field in self.fields]
+        rows = list(queryset.order_by(*ordering)[: self.size + 1])
+        has_more = len(rows) > self.size
+        rows = rows[: self.size]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = prev_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self._encode(rows[-1], "n")
+            if cursor and (has_more or not backwards):
+                prev_cursor = self._encode(rows[0], "p")
+        return rows, next_cursor, prev_cursor
+
+    def _encode(self, obj, direction):
+        if isinstance(obj, dict):
+            obj = SimpleNamespace(
+                **{field.attname: obj[field.name] for field in self.fields}
+            )
+        values = [field.value_to_string(obj) for field in self.fields]
+        return encode_cursor({"o": self.order_by, "d": direction, "v": values})
+
+    def _decode_values(self, values):
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise ValidationError("Invalid cursor")
+        try:
+            return [field.to_python(value) for field, value in zip(self.fields, values)]
+        except DjangoValidationError:
+            raise ValidationError("Invalid cursor")
+
+
+def estimate_count(queryset, threshold=1000):
+    """
+    Row estimate from the PostgreSQL planner for `queryset`.
+    Returns None on other databases, or when the estimate is below `threshold`
+    (small results are cheap to count exactly and estimates are least reliable there).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    rows = int(plan[0]["Plan"]["Plan Rows"])
+    if rows < threshold:
+        return None
+    return rows
+
+
+def get_query_signature(queryset):
+    """
+    Stable digest of the SQL and parameters of `queryset`, independent of ordering.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    return hashlib.md5(repr((sql, params)).encode()).hexdigest()
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator with a precomputed count, so it does not run its own COUNT(*).
+    The count may be cached or estimated, so pages are not clipped to it.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.__dict__["count"] = count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom : bottom + self.per_page], number, self
+        )
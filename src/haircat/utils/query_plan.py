@@ -0,0 +1,180 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """
+    # QueryPlan
+    select_related/prefetch_related lookups needed to serialize a queryset
+    without issuing extra queries per row.
+
+    **Attributes**
+    - select_related: list of select_related lookups
+    - prefetch_related: list of prefetch_related lookups (strings or Prefetch objects)
+    """
+
+    def __init__(self, select_related=None, prefetch_related=None):
+        self.select_related = list(select_related or [])
+        self.prefetch_related = list(prefetch_related or [])
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    def __repr__(self):
+        return (
+            f"QueryPlan(select_related={self.select_related}, "
+            f"prefetch_related={self.prefetch_related})"
+        )
+
+
+class _RelationNode:
+    """A model reached from the root queryset through a chain of relations."""
+
+    def __init__(self, model, field=None):
+        self.model = model
+        self.field = field  # relation followed from the parent node
+        self.many = field is not None and (field.many_to_many or field.one_to_many)
+        self.children = {}
+
+    def child(self, name, field):
+        if name not in self.children:
+            self.children[name] = _RelationNode(field.related_model, field)
+        return self.children[name]
+
+
+def _get_relation(model, name):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation or field.related_model is None:
+        return None
+    return field
+
+
+def _walk_relations(node, source_attrs):
+    """
+    Follow the leading relation segments of a field source.
+    Returns the node reached and whether every segment was a relation.
+    """
+    for attr in source_attrs:
+        field = _get_relation(node.model, attr)
+        if field is None:
+            return node, False
+        node = node.child(attr, field)
+    return node, True
+
+
+def _walk_serializer(serializer, node):
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            target, complete = _walk_relations(node, field.source_attrs)
+            if complete and isinstance(field.child, serializers.BaseSerializer):
+                _walk_serializer(field.child, target)
+        elif isinstance(field, serializers.BaseSerializer):
+            target, complete = _walk_relations(node, field.source_attrs)
+            if complete:
+                _walk_serializer(field, target)
+        elif isinstance(field, serializers.ManyRelatedField):
+            _walk_relations(node, field.source_attrs)
+        elif (
+            isinstance(field, serializers.RelatedField)
+            and field.use_pk_only_optimization()
+        ):
+            # pk-only related fields read the local `<name>_id` column
+            _walk_relations(node, field.source_attrs[:-1])
+        else:
+            _walk_relations(node, field.source_attrs)
+
+
+def _add_lookup(node, lookup):
+    for name in lookup.split("__"):
+        field = _get_relation(node.model, name)
+        if field is None:
+            raise ValueError(
+                f"'{lookup}' is not a relation path on {node.model.__name__}"
+            )
+        node = node.child(name, field)
+
+
+def _compile(node, prefix=""):
+    select_related = []
+    prefetch_related = []
+    for name, child in node.children.items():
+        path = f"{prefix}{name}"
+        if child.many:
+            child_select, child_prefetch = _compile(child)
+            queryset = child.model._default_manager.all()
+            if child_select:
+                queryset = queryset.select_related(*child_select)
+            if child_prefetch:
+                queryset = queryset.prefetch_related(*child_prefetch)
+            prefetch_related.append(Prefetch(path, queryset=queryset))
+        else:
+            child_select, child_prefetch = _compile(child, f"{path}__")
+            select_related.extend(child_select or [path])
+            prefetch_related.extend(child_prefetch)
+    return select_related, prefetch_related
+
+
+def _build_tree(serializer, model, lookups):
+    root = _RelationNode(model)
+    if serializer is not None:
+        _walk_serializer(serializer, root)
+    for lookup in lookups:
+        _add_lookup(root, lookup)
+    return root
+
+
+def build_query_plan(serializer, model, select_related=None, prefetch_related=None):
+    """
+    Build the QueryPlan for serializing `model` instances with `serializer`.
+
+    Nested serializers and pk-list fields that map onto model relations are
+    joined (forward FK / one-to-one) or prefetched (reverse FK / many-to-many).
+    Relations only reachable through model properties cannot be discovered and
+    should be passed through `select_related`/`prefetch_related`.
+
+    **Args**
+    - serializer: serializer instance, or None to use only the explicit lookups
+    - model: the serializer's model class
+    - select_related: extra relation paths to join
+    - prefetch_related: extra relation paths or Prefetch objects to prefetch
+    """
+    lookups = list(select_related or [])
+    extra_prefetch = []
+    for lookup in prefetch_related or []:
+        if isinstance(lookup, Prefetch):
+            extra_prefetch.append(lookup)
+        else:
+            lookups.append(lookup)
+
+    select, prefetch = _compile(_build_tree(serializer, model, lookups))
+    return QueryPlan(select, prefetch + extra_prefetch)
+
+
+def get_relation_paths(serializer, model, lookups=()):
+    """
+    Every model whose rows end up in the serialized output of `model` instances,
+    as (lookup, model, field) tuples: `lookup` leads from `model` to the related rows
+    ("" for `model` itself) and `field` is the last relation followed (None for the root).
+    Discovered like build_query_plan(); `lookups` adds relation paths the serializer
+    reads without declaring them (model properties, method fields).
+    """
+    paths = []
+
+    def visit(node, lookup):
+        paths.append((lookup, node.model, node.field))
+        for name, child in node.children.items():
+            visit(child, f"{lookup}__{name}" if lookup else name)
+
+    visit(_build_tree(serializer, model, lookups), "")
+    return paths
@@ -0,0 +1,74 @@
+import gzip
+import hashlib
+import json
+import re
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+_accepts_gzip = re.compile(r"\bgzip\b")
+
+
+class RenderedEntry:
+    """
+    # RenderedEntry
+    Response body rendered once with JSONRenderer and cached as bytes,
+    so cache hits are served without serializing or rendering again.
+
+    **Attributes**
+    - content: the JSON bytes, gzip compressed when `gzipped`
+    - etag: weak ETag of the JSON (the same for the compressed and plain body)
+    - gzipped: content is gzip compressed
+    """
+
+    __slots__ = ("content", "etag", "gzipped")
+
+    def __init__(self, content, etag, gzipped=False):
+        self.content = content
+        self.etag = etag
+        self.gzipped = gzipped
+
+    @classmethod
+    def render(cls, data, gzip_min_size=None):
+        """
+        Render `data` like a JSON Response would; bodies of at least `gzip_min_size` bytes are compressed
+        """
+        content = JSONRenderer().render(data)
+        etag = f'W/"{hashlib.md5(content).hexdigest()}"'
+        if gzip_min_size is not None and len(content) >= gzip_min_size:
+            return cls(gzip.compress(content, compresslevel=6), etag, gzipped=True)
+        return cls(content, etag)
+
+    def json(self):
+        return gzip.decompress(self.content) if self.gzipped else self.content
+
+    def data(self):
+        return json.loads(self.json())
+
+    def to_response(self, request):
+        """
+        The cached bytes as an application/json response, compressed for clients that accept gzip
+        """
+        if self.gzipped and _accepts_gzip.search(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        ):
+            response = HttpResponse(self.content, content_type="application/json")
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(self.json(), content_type="application/json")
+        if self.gzipped:
+            patch_vary_headers(response, ("Accept-Encoding",))
+        response["ETag"] = self.etag
+        return response
+
+
+def join_objects(entries, extra):
+    """
+    JSON body `{"objects": [...], **extra}` built from the cached bytes of each object
+    """
+    body = b",".join(entry.json() for entry in entries)
+    tail = JSONRenderer().render(extra)[1:]
+    if tail != b"}":
+        tail = b"," + tail
+    return b'{"objects":[' + body + b"]" + tail
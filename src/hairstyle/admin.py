@@ -40,7 +40,14 @@ class ServiceAdmin(admin.ModelAdmin):
     )
     list_filter = ("specialist", "created_at")
     search_fields = ("name", "description", "specialist__user__username")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = (
+        "average_rating",
+        "total_reviews",
+        "rating_sum",
+        "total_appointments",
+        "created_at",
+        "updated_at",
+    )
     inlines = [ServiceImageInline, ServiceLabelInline]
 
 
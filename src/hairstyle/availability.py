@@ -0,0 +1,183 @@
+import datetime
+from collections import defaultdict
+
+from django.db.models import Q
+from django.utils import timezone
+
+from account.models import DayAvailability, DayOff
+from hairstyle.models.appointment import Appointment
+
+BLOCKING_STATUSES = Appointment.BLOCKING_STATUSES
+MAX_RANGE_DAYS = 62  # longest date range searched at once
+
+
+def day_of_week(date):
+    """DayAvailability.day_of_week of `date` (0=Sunday through 6=Saturday)"""
+    return date.isoweekday() % 7
+
+
+def merge(intervals):
+    """Sorted, non-overlapping union of (start, end) intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(windows, busy):
+    """
+    Parts of `windows` not covered by `busy`, in one sweep over both
+    (both sorted and non-overlapping, see merge())
+    """
+    free = []
+    i = 0
+    for start, end in windows:
+        # busy intervals ending before this window cannot reach later windows either
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        cursor = start
+        j = i
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] > cursor:
+                free.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
+
+
+def get_weekly_windows(availability):
+    """
+    (start_time, end_time) windows of a DayAvailability: its available time slots when it
+    has time slots (prefetched), otherwise the whole day availability
+    """
+    slots = list(availability.time_slots.all())
+    if not slots:
+        return [(availability.start_time, availability.end_time)]
+    return [(slot.start_time, slot.end_time) for slot in slots if slot.is_available]
+
+
+class Schedule:
+    """
+    # Schedule
+    Preloaded availability rows of one specialist over a date range.
+
+    **Attributes**
+    - weekly: {day_of_week: [(start_time, end_time)]} bookable windows of each weekday
+    - days_off: set of dates without availability
+    - busy: sorted, merged (start, end) datetimes of blocking appointments
+    """
+
+    def __init__(self):
+        self.weekly = defaultdict(list)
+        self.days_off = set()
+        self.busy = []
+
+    def get_windows(self, date):
+        """Sorted, merged (start, end) datetimes the specialist works on `date`"""
+        if date in self.days_off:
+            return []
+        tz = timezone.get_current_timezone()
+        return merge(
+            (
+                timezone.make_aware(datetime.datetime.combine(date, start), tz),
+                timezone.make_aware(datetime.datetime.combine(date, end), tz),
+            )
+            for start, end in self.weekly.get(day_of_week(date), ())
+        )
+
+    def free_intervals(self, start_date, end_date, duration, now=None):
+        """
+        Free (start, end) datetimes from `start_date` through `end_date` that fit
+        `duration` (timedelta); none start before `now`
+        """
+        windows = []
+        date = start_date
+        while date <= end_date:
+            windows.extend(self.get_windows(date))
+            date += datetime.timedelta(days=1)
+        if now is not None:
+            windows = [(max(start, now), end) for start, end in windows if end > now]
+        return [
+            (start, end)
+            for start, end in subtract(windows, self.busy)
+            if end - start >= duration
+        ]
+
+
+def load_schedules(specialist_ids, start_date, end_date, barber_id=None):
+    """
+    {specialist id: Schedule} for `specialist_ids` from `start_date` through `end_date`,
+    loaded with four queries whatever the number of specialists or days:
+    day availabilities, their time slots, days off and blocking appointments.
+    With `barber_id`, only that barber's appointments (and unassigned ones) are busy.
+    """
+    specialist_ids = list(specialist_ids)
+    schedules = {specialist_id: Schedule() for specialist_id in specialist_ids}
+
+    availabilities = DayAvailability.objects.filter(
+        specialist_id__in=specialist_ids
+    ).prefetch_related("time_slots")
+    for availability in availabilities:
+        schedules[availability.specialist_id].weekly[availability.day_of_week].extend(
+            get_weekly_windows(availability)
+        )
+
+    days_off = DayOff.objects.filter(
+        specialist_id__in=specialist_ids, date__range=(start_date, end_date)
+    ).values_list("specialist_id", "date")
+    for specialist_id, date in days_off:
+        schedules[specialist_id].days_off.add(date)
+
+    tz = timezone.get_current_timezone()
+    range_start = timezone.make_aware(
+        datetime.datetime.combine(start_date, datetime.time()), tz
+    )
+    range_end = timezone.make_aware(
+        datetime.datetime.combine(
+            end_date + datetime.timedelta(days=1), datetime.time()
+        ),
+        tz,
+    )
+    appointments = Appointment.objects.filter(
+        service__specialist_id__in=specialist_ids,
+        status__in=BLOCKING_STATUSES,
+        schedule__lt=range_end,
+        ends_at__gt=range_start,
+    )
+    if barber_id is not None:
+        appointments = appointments.filter(
+            Q(barber_id=barber_id) | Q(barber__isnull=True)
+        )
+    busy = defaultdict(list)
+    for specialist_id, schedule, ends_at in appointments.values_list(
+        "service__specialist_id", "schedule", "ends_at"
+    ):
+        busy[specialist_id].append(
+            (timezone.localtime(schedule, tz), timezone.localtime(ends_at, tz))
+        )
+    for specialist_id, intervals in busy.items():
+        schedules[specialist_id].busy = merge(intervals)
+
+    return schedules
+
+
+def find_free_intervals(
+    specialist_ids, start_date, end_date, duration_minutes, barber_id=None, now=None
+):
+    """
+    {specialist id: [(start, end)]} bookable intervals of at least `duration_minutes`
+    from `start_date` through `end_date` (any start up to `end - duration` fits)
+    """
+    duration = datetime.timedelta(minutes=max(duration_minutes, 1))
+    now = timezone.now() if now is None else now
+    schedules = load_schedules(specialist_ids, start_date, end_date, barber_id)
+    return {
+        specialist_id: schedule.free_intervals(start_date, end_date, duration, now)
+        for specialist_id, schedule in schedules.items()
+    }
@@ -11,7 +11,8 @@ class ServiceBaseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Service
-        fields = "__all__"
+        # rating_sum only backs average_rating
+        exclude = ["rating_sum"]
 
 
 class LabelBaseSerializer(serializers.ModelSerializer):
@@ -0,0 +1,171 @@
+from django.apps import apps as global_apps
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Now, Round
+from django.db.models.lookups import GreaterThan
+
+from haircat.utils.cache_dependencies import invalidate_dependents
+
+# Models holding review counters, in the order of review_targets():
+# (app label, model, Review lookup, count field, average precision)
+RATED_MODELS = (
+    ("hairstyle", "Service", "appointment__service", "total_reviews", None),
+    ("account", "Specialist", "appointment__service__specialist", "reviews_count", 1),
+    ("account", "Barber", "appointment__barber", "reviews_count", 1),
+)
+
+
+def average(total, count, precision=None):
+    """
+    `total / count` as a float expression, 0 when `count` is 0,
+    rounded to `precision` decimals when given
+    """
+    value = Cast(total, FloatField()) / count
+    if precision is not None:
+        # PostgreSQL only rounds numerics to a number of decimals
+        value = Cast(
+            Round(
+                Cast(value, DecimalField(max_digits=12, decimal_places=6)), precision
+            ),
+            FloatField(),
+        )
+    return Case(
+        When(GreaterThan(count, 0), then=value),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def review_targets(appointment_id, using=DEFAULT_DB_ALIAS):
+    """
+    (service id, specialist id, barber id) a review of the appointment counts toward,
+    or None when the appointment does not exist
+    """
+    Appointment = global_apps.get_model("hairstyle", "Appointment")
+    return (
+        Appointment._base_manager.using(using)
+        .filter(pk=appointment_id)
+        .values_list("service_id", "service__specialist_id", "barber_id")
+        .first()
+    )
+
+
+def add_reviews(targets, rating, count, using=DEFAULT_DB_ALIAS):
+    """
+    Add `rating` to the rating sums and `count` to the review counts of `targets`
+    (from review_targets()), recomputing their averages in the same UPDATE
+    """
+    for counter, pk in zip(RATED_MODELS, targets or ()):
+        _add_reviews(counter, pk, rating, count, using)
+
+
+def move_reviews(old_targets, targets, old_rating, rating, using=DEFAULT_DB_ALIAS):
+    """
+    Move a review rated `old_rating` from `old_targets` to `targets` with `rating`;
+    targets in both only get the rating difference
+    """
+    old_targets = old_targets or (None,) * len(RATED_MODELS)
+    targets = targets or (None,) * len(RATED_MODELS)
+    for counter, old_pk, pk in zip(RATED_MODELS, old_targets, targets):
+        if old_pk == pk:
+            _add_reviews(counter, pk, rating - old_rating, 0, using)
+        else:
+            _add_reviews(counter, old_pk, -old_rating, -1, using)
+            _add_reviews(counter, pk, rating, 1, using)
+
+
+def _add_reviews(counter, pk, rating, count, using):
+    if pk is None or (not rating and not count):
+        return
+    app_label, model_name, _, count_field, precision = counter
+    model = global_apps.get_model(app_label, model_name)
+    # column references in SET see the values from before the update
+    model._base_manager.using(using).filter(pk=pk).update(
+        rating_sum=F("rating_sum") + rating,
+        average_rating=average(
+            F("rating_sum") + rating, F(count_field) + count, precision
+        ),
+        updated_at=Now(),
+        **{count_field: F(count_field) + count},
+    )
+    invalidate_dependents(model, [pk], using)
+
+
+def add_appointments(service_id, count, using=DEFAULT_DB_ALIAS):
+    if service_id is None or not count:
+        return
+    Service = global_apps.get_model("hairstyle", "Service")
+    Service._base_manager.using(using).filter(pk=service_id).update(
+        total_appointments=F("total_appointments") + count, updated_at=Now()
+    )
+    invalidate_dependents(Service, [service_id], using)
+
+
+def rebuild_counters(apps=global_apps, using=DEFAULT_DB_ALIAS):
+    """
+    Recompute the counters from the reviews and appointments, for rows written
+    without signals (queryset.update(), raw SQL, fixtures).
+    Only rows whose counters drifted are written; returns {model: their pks}.
+    """
+    Review = apps.get_model("hairstyle", "Review")
+    Appointment = apps.get_model("hairstyle", "Appointment")
+    rebuilt = {}
+
+    for app_label, model_name, lookup, count_field, precision in RATED_MODELS:
+        model = apps.get_model(app_label, model_name)
+        reviews = (
+            Review._base_manager.using(using)
+            .filter(**{lookup: OuterRef("pk")})
+            .order_by()
+            .values(lookup)
+        )
+        rating_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum("rating")).values("total")), 0
+        )
+        count = Coalesce(
+            Subquery(reviews.annotate(total=Count("pk")).values("total")), 0
+        )
+        rebuilt[model] = _rebuild(
+            model._base_manager.using(using),
+            rating_sum=rating_sum,
+            average_rating=average(rating_sum, count, precision),
+            **{count_field: count},
+        )
+
+    Service = apps.get_model("hairstyle", "Service")
+    appointments = (
+        Appointment._base_manager.using(using)
+        .filter(service=OuterRef("pk"))
+        .order_by()
+        .values("service")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    pks = _rebuild(
+        Service._base_manager.using(using),
+        total_appointments=Coalesce(Subquery(appointments), 0),
+    )
+    rebuilt[Service] = sorted(set(rebuilt.get(Service, [])) | set(pks))
+    return rebuilt
+
+
+def _rebuild(queryset, **counters):
+    expected = {f"expected_{name}": value for name, value in counters.items()}
+    drifted = queryset.annotate(**expected).exclude(
+        **{name: F(f"expected_{name}") for name in counters}
+    )
+    pks = list(drifted.values_list("pk", flat=True))
+    if pks:
+        queryset.filter(pk__in=pks).update(**counters)
+    return pks
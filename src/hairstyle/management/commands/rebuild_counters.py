@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from haircat.utils.cache_dependencies import invalidate_dependents
+from hairstyle.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the stored rating, review and appointment counters of "
+        "services, specialists and barbers from the reviews and appointments"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to rebuild the counters on (default: default)",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        with transaction.atomic(using=using):
+            rebuilt = rebuild_counters(using=using)
+            for model, pks in rebuilt.items():
+                if pks:
+                    invalidate_dependents(model, pks, using)
+
+        for model, pks in rebuilt.items():
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {len(pks)} rebuilt")
+        self.stdout.write(self.style.SUCCESS("Counters rebuilt"))
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 07:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hairstyle", "0010_update_review_appointment_to_onetoone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointmentmessage",
+            index=models.Index(
+                fields=["appointment_message_thread", "created_at", "id"],
+                name="apptmessage_thread_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hairstyle", "0011_appointmentmessage_apptmessage_thread_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="service",
+            name="average_rating",
+            field=models.FloatField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="rating_sum",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="total_appointments",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="service",
+            name="total_reviews",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
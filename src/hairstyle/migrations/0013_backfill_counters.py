@@ -0,0 +1,107 @@
+from django.db import migrations
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.models.lookups import GreaterThan
+
+# Frozen copy of hairstyle.counters as of this migration, so later edits to that
+# module do not change what the migration does.
+# (app label, model, Review lookup, count field, average precision)
+RATED_MODELS = (
+    ("hairstyle", "Service", "appointment__service", "total_reviews", None),
+    ("account", "Specialist", "appointment__service__specialist", "reviews_count", 1),
+    ("account", "Barber", "appointment__barber", "reviews_count", 1),
+)
+
+
+def average(total, count, precision=None):
+    value = Cast(total, FloatField()) / count
+    if precision is not None:
+        # PostgreSQL only rounds numerics to a number of decimals
+        value = Cast(
+            Round(
+                Cast(value, DecimalField(max_digits=12, decimal_places=6)), precision
+            ),
+            FloatField(),
+        )
+    return Case(
+        When(GreaterThan(count, 0), then=value),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def rebuild(queryset, **counters):
+    expected = {f"expected_{name}": value for name, value in counters.items()}
+    drifted = queryset.annotate(**expected).exclude(
+        **{name: F(f"expected_{name}") for name in counters}
+    )
+    pks = list(drifted.values_list("pk", flat=True))
+    if pks:
+        queryset.filter(pk__in=pks).update(**counters)
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Fill the new counter columns from the existing reviews and appointments
+    """
+    using = schema_editor.connection.alias
+    Review = apps.get_model("hairstyle", "Review")
+    Appointment = apps.get_model("hairstyle", "Appointment")
+
+    for app_label, model_name, lookup, count_field, precision in RATED_MODELS:
+        model = apps.get_model(app_label, model_name)
+        reviews = (
+            Review._base_manager.using(using)
+            .filter(**{lookup: OuterRef("pk")})
+            .order_by()
+            .values(lookup)
+        )
+        rating_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum("rating")).values("total")), 0
+        )
+        count = Coalesce(
+            Subquery(reviews.annotate(total=Count("pk")).values("total")), 0
+        )
+        rebuild(
+            model._base_manager.using(using),
+            rating_sum=rating_sum,
+            average_rating=average(rating_sum, count, precision),
+            **{count_field: count},
+        )
+
+    Service = apps.get_model("hairstyle", "Service")
+    appointments = (
+        Appointment._base_manager.using(using)
+        .filter(service=OuterRef("pk"))
+        .order_by()
+        .values("service")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    rebuild(
+        Service._base_manager.using(using),
+        total_appointments=Coalesce(Subquery(appointments), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("account", "0028_barber_average_rating_barber_rating_sum_and_more"),
+        ("hairstyle", "0012_service_average_rating_service_rating_sum_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+import datetime
+
+from django.db import migrations, models
+
+
+def backfill_ends_at(apps, schema_editor):
+    """
+    End existing appointments after their service duration (at least one minute)
+    """
+    Appointment = apps.get_model("hairstyle", "Appointment")
+    manager = Appointment._base_manager.db_manager(schema_editor.connection.alias)
+    appointments = (
+        manager.filter(ends_at__isnull=True)
+        .only("schedule", "service__duration_minutes")
+        .select_related("service")
+    )
+    batch = []
+    for appointment in appointments.iterator(chunk_size=1000):
+        minutes = max(appointment.service.duration_minutes or 0, 1)
+        appointment.ends_at = appointment.schedule + datetime.timedelta(minutes=minutes)
+        batch.append(appointment)
+        if len(batch) == 1000:
+            manager.bulk_update(batch, ["ends_at"])
+            batch = []
+    if batch:
+        manager.bulk_update(batch, ["ends_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hairstyle", "0013_backfill_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="appointment",
+            name="ends_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_ends_at, migrations.RunPython.noop),
+    ]
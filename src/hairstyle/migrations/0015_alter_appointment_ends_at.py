@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hairstyle", "0014_appointment_ends_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="appointment",
+            name="ends_at",
+            field=models.DateTimeField(editable=False),
+        ),
+    ]
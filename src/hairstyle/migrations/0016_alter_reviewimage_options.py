@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:04
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hairstyle", "0015_alter_appointment_ends_at"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="reviewimage",
+            options={"ordering": ["order"]},
+        ),
+    ]
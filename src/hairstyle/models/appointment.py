@@ -1,4 +1,6 @@
-from django.db import models
+import datetime
+
+from django.db import models, router, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
@@ -40,6 +42,8 @@ class Appointment(models.Model):
         Service, on_delete=models.CASCADE, related_name="Appointments"
     )
     schedule = models.DateTimeField()
+    # end of the booked interval, from the service duration when saved
+    ends_at = models.DateTimeField(editable=False)
     status = models.IntegerField(choices=STATUS_CHOICES, default=PENDING)
     notes = models.TextField(max_length=255, null=True, blank=True)
     barber = models.ForeignKey(
@@ -52,6 +56,9 @@ class Appointment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # appointments that occupy the specialist's time
+    BLOCKING_STATUSES = [PENDING, CONFIRMED]
+
     @property
     def specialist(self):
         return self.service.specialist
@@ -63,40 +70,66 @@ class Appointment(models.Model):
     def __str__(self):
         return f"{self.customer.user.full_name} - {self.service.name}"
 
+    @staticmethod
+    def get_ends_at(schedule, duration_minutes):
+        # an appointment occupies at least its starting minute
+        return schedule + datetime.timedelta(minutes=max(duration_minutes or 0, 1))
+
     def save(self, *args, **kwargs):
-        specialist = self.service.specialist
-
-        # Fetch Appointments of that user that matches the schedule. If there is, throw an error
-        if not specialist.barber_shop:
-            query = Appointment.objects.filter(
-                service__specialist_id=specialist.id,
-                schedule=self.schedule,
-                status=self.CONFIRMED,
-            )
-            if self.pk:  # Exclude self if updating
-                query = query.exclude(pk=self.pk)
-            if query.exists():
-                raise ValidationError("This time slot is already booked")
-        else:
-            query = Appointment.objects.filter(
-                service__specialist_id=specialist.id,
-                barber=self.barber,
-                schedule=self.schedule,
-                status=self.CONFIRMED,
+        using = kwargs.get("using") or router.db_for_write(Appointment, instance=self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"schedule", "service", "service_id"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = [*update_fields, "ends_at"]
+        adding = self._state.adding
+
+        # the counters updated by hairstyle.signals commit or roll back with the appointment
+        with transaction.atomic(using=using):
+            # Bookings of a specialist run one at a time: the lock on the specialist row is
+            # held until commit, so a concurrent booking sees this one in its overlap check
+            service = (
+                Service.objects.using(using)
+                .select_related("specialist")
+                .select_for_update(of=("specialist",))
+                .only(
+                    "duration_minutes",
+                    "specialist__barber_shop_id",
+                    "specialist__auto_accept_appointment",
+                )
+                .get(pk=self.service_id)
             )
-            if self.pk:  # Exclude self if updating
-                query = query.exclude(pk=self.pk)
-            if query.exists():
-                raise ValidationError("This time slot is already booked")
-
-        if specialist.auto_accept_appointment and self.status == self.PENDING:
-            self.status = self.CONFIRMED
-
-        super().save(*args, **kwargs)
-        
-        # Only try to create thread after the appointment has been saved
-        if not AppointmentMessageThread.objects.filter(appointment=self).exists():
-            AppointmentMessageThread.objects.create(appointment=self)
+            specialist = service.specialist
+            self.ends_at = self.get_ends_at(self.schedule, service.duration_minutes)
+
+            # Cancelled and completed appointments never conflict
+            if self.status in self.BLOCKING_STATUSES:
+                query = Appointment.objects.using(using).filter(
+                    service__specialist_id=specialist.id,
+                    status__in=self.BLOCKING_STATUSES,
+                    schedule__lt=self.ends_at,
+                    ends_at__gt=self.schedule,
+                )
+                # Barber shops book each barber separately
+                if specialist.barber_shop_id:
+                    query = query.filter(barber_id=self.barber_id)
+                if self.pk:  # Exclude self if updating
+                    query = query.exclude(pk=self.pk)
+                if query.exists():
+                    raise ValidationError("This time slot is already booked")
+
+            if specialist.auto_accept_appointment and self.status == self.PENDING:
+                self.status = self.CONFIRMED
+
+            super().save(*args, **kwargs)
+
+            # Only try to create thread after the appointment has been saved
+            if adding:
+                AppointmentMessageThread.objects.using(using).create(appointment=self)
+            else:
+                AppointmentMessageThread.objects.using(using).get_or_create(
+                    appointment=self
+                )
 
 
 class Review(models.Model):
@@ -113,11 +146,16 @@ class Review(models.Model):
 
     @property
     def images(self):
-        return self.Images.all().order_by("order")
+        return self.Images.all()
 
     def __str__(self):
         return f"{self.appointment.customer.user.full_name} - {self.appointment.service.name}"
 
+    def save(self, *args, **kwargs):
+        # the counters updated by hairstyle.signals commit or roll back with the review
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
 
 class ReviewImage(models.Model):
     review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name="Images")
@@ -131,6 +169,9 @@ class ReviewImage(models.Model):
         self.order = self.review.images.count()
         super().save(*args, **kwargs)
 
+    class Meta:
+        ordering = ["order"]
+
 
 class AppointmentMessageThread(models.Model):
     appointment = models.OneToOneField(
@@ -155,7 +196,7 @@ class AppointmentMessageThread(models.Model):
             return f"{self.last_message.sender.full_name}: {self.last_message.message}"
 
     def mark_unread_messages(self, user):
-        self.Messages.exclude(sender=user).update(read=True)
+        return self.Messages.exclude(sender=user).update(read=True)
 
     def send_message(self, message, sender):
         # mark messages from other user as read then create new message
@@ -176,12 +217,20 @@ class AppointmentMessageThread(models.Model):
             return f"{self.appointment.service.specialist.user.full_name} - {self.appointment.service.name}"
         else:
             return f"{self.appointment.customer.user.full_name} - {self.appointment.service.name}"
-    
+
     def get_title_pfp_url(self, user):
         if user == self.appointment.customer.user:
-            return self.appointment.service.specialist.user.pfp.url if self.appointment.service.specialist.user.pfp else None
+            return (
+                self.appointment.service.specialist.user.pfp.url
+                if self.appointment.service.specialist.user.pfp
+                else None
+            )
         else:
-            return self.appointment.customer.user.pfp.url if self.appointment.customer.user.pfp else None
+            return (
+                self.appointment.customer.user.pfp.url
+                if self.appointment.customer.user.pfp
+                else None
+            )
 
 
 class AppointmentMessage(models.Model):
@@ -195,5 +244,14 @@ class AppointmentMessage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # keyset pagination over a thread's message history
+            models.Index(
+                fields=["appointment_message_thread", "created_at", "id"],
+                name="apptmessage_thread_created_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.appointment_message_thread.appointment.customer.user.full_name} - {self.appointment_message_thread.appointment.service.name}"
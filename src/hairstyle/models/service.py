@@ -1,5 +1,4 @@
 from django.db import models
-from django.db.models import Avg
 
 from account.models import Specialist
 from general.models import File
@@ -16,6 +15,13 @@ class Label(models.Model):
     def total_services(self):
         return self.ServiceLabels.count()
 
+    @staticmethod
+    def total_services_annotation():
+        """total_services as a query expression"""
+        from haircat.utils.annotations import aggregate_subquery
+
+        return aggregate_subquery(ServiceLabel.objects, "label", models.Count("pk"))
+
 
 class Service(models.Model):
     specialist = models.ForeignKey(
@@ -26,29 +32,15 @@ class Service(models.Model):
     duration_minutes = models.IntegerField(default=0)
     price = models.FloatField()
     points = models.IntegerField(default=0)
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
-
-    @property
-    def average_rating(self):
-        from hairstyle.models.appointment import Review
 
-        return (
-            Review.objects.filter(appointment__service=self).aggregate(Avg("rating"))[
-                "rating__avg"
-            ]
-            or 0
-        )
+    # review and appointment counters, kept up to date by hairstyle.counters
+    rating_sum = models.IntegerField(default=0, editable=False)
+    total_reviews = models.IntegerField(default=0, editable=False)
+    average_rating = models.FloatField(default=0, editable=False, db_index=True)
+    total_appointments = models.IntegerField(default=0, editable=False)
 
-    @property
-    def total_reviews(self):
-        from hairstyle.models.appointment import Review
-
-        return Review.objects.filter(appointment__service=self).count()
-
-    @property
-    def total_appointments(self):
-        return self.Appointments.count()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     @property
     def specialist_location(self):
@@ -56,7 +48,7 @@ class Service(models.Model):
 
     @property
     def images(self):
-        return self.ServiceImages.all().order_by("order")
+        return self.ServiceImages.all()
 
     @property
     def labels(self):
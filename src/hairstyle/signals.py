@@ -1,6 +1,7 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models.appointment import Appointment
+from .models.appointment import Appointment, Review
+from .counters import add_appointments, add_reviews, move_reviews, review_targets
 from general.webhooks import send_webhook
 from account.models.custom_user import UserNotification
 
@@ -12,7 +13,7 @@ def appointment_status_change_handler(sender, instance, **kwargs):
     """
     if not instance.pk:  # Skip for new instances
         return
-        
+
     try:
         old_instance = Appointment.objects.get(pk=instance.pk)
         if old_instance.status != instance.status:
@@ -21,21 +22,21 @@ def appointment_status_change_handler(sender, instance, **kwargs):
                     user=instance.customer.user,
                     message=f"Your appointment for {instance.service.name} has been confirmed",
                     type=UserNotification.APPOINTMENT_TYPE,
-                    redirect_id=instance.id
+                    redirect_id=instance.id,
                 )
             elif instance.status == Appointment.CANCELLED:
                 UserNotification.objects.create(
                     user=instance.customer.user,
                     message=f"Your appointment for {instance.service.name} has been cancelled",
                     type=UserNotification.APPOINTMENT_TYPE,
-                    redirect_id=instance.id
+                    redirect_id=instance.id,
                 )
             elif instance.status == Appointment.COMPLETED:
                 UserNotification.objects.create(
                     user=instance.customer.user,
                     message=f"Your appointment for {instance.service.name} has been completed",
                     type=UserNotification.APPOINTMENT_TYPE,
-                    redirect_id=instance.id
+                    redirect_id=instance.id,
                 )
     except Appointment.DoesNotExist:
         pass
@@ -48,26 +49,26 @@ def appointment_webhook_handler(sender, instance, created, **kwargs):
     Also create user notification for specialist when there is a new appointment.
     """
     # Determine event type
-    event_name = 'new_appointment' if created else 'update_appointment'
-    
+    event_name = "new_appointment" if created else "update_appointment"
+
     # Send webhook to specialist
     specialist_user_id = instance.service.specialist.user.id
     send_webhook(
         event_name=event_name,
         user_id=specialist_user_id,
         data={
-            'id': instance.id,
-        }
+            "id": instance.id,
+        },
     )
-    
+
     # Send webhook to customer
     customer_user_id = instance.customer.user.id
     send_webhook(
         event_name=event_name,
         user_id=customer_user_id,
         data={
-            'id': instance.id,
-        }
+            "id": instance.id,
+        },
     )
 
     # Create notification for specialist if it's a new appointment
@@ -76,5 +77,112 @@ def appointment_webhook_handler(sender, instance, created, **kwargs):
             user=instance.service.specialist.user,
             message=f"New appointment request from {instance.customer.user.full_name} for {instance.service.name}",
             type=UserNotification.APPOINTMENT_TYPE,
-            redirect_id=instance.id
-        ) 
\ No newline at end of file
+            redirect_id=instance.id,
+        )
+
+
+@receiver(pre_save, sender=Review)
+def review_counters_pre_save_handler(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Remember what the review counted toward before the save, to move or adjust it.
+    """
+    if raw or instance.pk is None:
+        return
+    old = (
+        Review._base_manager.using(using)
+        .filter(pk=instance.pk)
+        .values_list("appointment_id", "rating")
+        .first()
+    )
+    if old is not None:
+        instance._counted = (review_targets(old[0], using), old[1])
+
+
+@receiver(post_save, sender=Review)
+def review_counters_handler(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Keep the rating counters of the service, specialist and barber up to date.
+    Runs inside Review.save()'s transaction.
+    """
+    if raw:
+        return
+    targets = review_targets(instance.appointment_id, using)
+    counted = instance.__dict__.pop("_counted", None)
+    if counted is None:
+        add_reviews(targets, instance.rating, 1, using)
+    else:
+        move_reviews(counted[0], targets, counted[1], instance.rating, using)
+
+
+@receiver(pre_delete, sender=Review)
+def review_counters_pre_delete_handler(sender, instance, using=None, **kwargs):
+    # the appointment may be deleted along with the review
+    instance._counted = (
+        review_targets(instance.appointment_id, using),
+        instance.rating,
+    )
+
+
+@receiver(post_delete, sender=Review)
+def review_counters_delete_handler(sender, instance, using=None, **kwargs):
+    counted = instance.__dict__.pop("_counted", None)
+    if counted is not None:
+        add_reviews(counted[0], -counted[1], -1, using)
+
+
+@receiver(pre_save, sender=Appointment)
+def appointment_counters_pre_save_handler(
+    sender, instance, raw=False, using=None, **kwargs
+):
+    """
+    Remember the service, barber and review rating before the save,
+    to move the counters when the appointment changes service or barber.
+    """
+    if raw or instance.pk is None:
+        return
+    old = (
+        Appointment._base_manager.using(using)
+        .filter(pk=instance.pk)
+        .values_list(
+            "service_id", "service__specialist_id", "barber_id", "review__rating"
+        )
+        .first()
+    )
+    if old is not None:
+        instance._counted = old
+
+
+@receiver(post_save, sender=Appointment)
+def appointment_counters_handler(
+    sender, instance, created, raw=False, using=None, **kwargs
+):
+    """
+    Keep Service.total_appointments up to date, and move the review's rating
+    when the appointment changed service or barber. Runs inside Appointment.save()'s transaction.
+    """
+    if raw:
+        return
+    counted = instance.__dict__.pop("_counted", None)
+    if created or counted is None:
+        add_appointments(instance.service_id, 1, using)
+        return
+
+    service_id, specialist_id, barber_id, rating = counted
+    if service_id != instance.service_id:
+        add_appointments(service_id, -1, using)
+        add_appointments(instance.service_id, 1, using)
+
+    if rating is not None:
+        move_reviews(
+            (service_id, specialist_id, barber_id),
+            (instance.service_id, instance.service.specialist_id, instance.barber_id),
+            rating,
+            rating,
+            using,
+        )
+
+
+@receiver(post_delete, sender=Appointment)
+def appointment_counters_delete_handler(sender, instance, using=None, **kwargs):
+    # its review, deleted with it, updates the rating counters itself
+    add_appointments(instance.service_id, -1, using)
@@ -1,3 +1,517 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import threading
+import time
+from urllib.parse import quote
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from account.models import Barber, BarberShop, Specialist
+from account.views import SpecialistView
+from general.models import File
+from haircat.testing import (
+    FastReadTestMixin,
+    QueryCountMixin,
+    call_view,
+    create_appointment,
+    create_customer,
+    create_service,
+    create_specialist,
+)
+from hairstyle.models import (
+    Appointment,
+    Label,
+    Review,
+    ReviewImage,
+    Service,
+    ServiceImage,
+    ServiceLabel,
+)
+from hairstyle.views.appointment import AppointmentView, ReviewView
+from haircat.utils.caching import bump_generation
+from hairstyle.counters import rebuild_counters
+from haircat.utils.local_cache import process_cache
+from hairstyle.views.service import (
+    LabelView,
+    ServiceImageView,
+    ServiceLabelView,
+    ServiceView,
+)
 
 # Create your tests here.
+
+
+class ConcurrentBookingTest(TransactionTestCase):
+    """
+    Bookings of the same interval from several threads at once:
+    the specialist lock lets exactly one of them through
+    """
+
+    THREADS = 8
+
+    def setUp(self):
+        self.service = create_service()
+        self.customers = [create_customer() for _ in range(self.THREADS)]
+        self.schedule = timezone.now().replace(
+            second=0, microsecond=0
+        ) + datetime.timedelta(days=2)
+
+    def test_one_booking_per_interval(self):
+        if connection.vendor == "sqlite" and (
+            connection.is_in_memory_db()
+            or connection.settings_dict["OPTIONS"].get("transaction_mode")
+            != "IMMEDIATE"
+        ):
+            self.skipTest("SQLite needs haircat.test_settings to book from threads")
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        errors = []
+
+        def book(customer, offset):
+            try:
+                barrier.wait()
+                Appointment.objects.create(
+                    customer=customer,
+                    service=self.service,
+                    schedule=self.schedule + datetime.timedelta(minutes=offset),
+                )
+                results.append("booked")
+            except ValidationError:
+                results.append("conflict")
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connections.close_all()
+
+        # every interval overlaps the others: they all start within the 45 minutes
+        threads = [
+            threading.Thread(target=book, args=(customer, index * 5))
+            for index, customer in enumerate(self.customers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count("booked"), 1)
+        self.assertEqual(results.count("conflict"), self.THREADS - 1)
+        self.assertEqual(Appointment.objects.filter(service=self.service).count(), 1)
+
+    def test_pending_booking_blocks_interval(self):
+        Specialist.objects.update(auto_accept_appointment=False)
+        Appointment.objects.create(
+            customer=self.customers[0], service=self.service, schedule=self.schedule
+        )
+        with self.assertRaises(ValidationError):
+            Appointment.objects.create(
+                customer=self.customers[1],
+                service=self.service,
+                schedule=self.schedule + datetime.timedelta(minutes=30),
+            )
+
+
+class FastReadTest(FastReadTestMixin, TestCase):
+    FIELDSETS = {
+        AppointmentView: [
+            "id,schedule,ends_at,status,notes,created_at,updated_at",
+            "id,customer.id,customer.user.username,customer.user.email,"
+            "customer.user.date_joined",
+            "id,service.id,service.name,service.price,service.duration_minutes",
+            "id,review.id,review.rating,review.comment,message_thread.id",
+        ],
+    }
+
+    def setUp(self):
+        service = create_service()
+        customer = create_customer()
+        schedule = timezone.now().replace(second=0, microsecond=0)
+        appointments = [
+            create_appointment(
+                service,
+                customer,
+                schedule + datetime.timedelta(hours=hours),
+                notes="Short" if hours else None,
+            )
+            for hours in range(3)
+        ]
+        Review.objects.create(appointment=appointments[0], rating=4, comment="Good")
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        service = create_service()
+        self.user = service.specialist.user
+        schedule = timezone.now().replace(second=0, microsecond=0)
+        self.appointments = [
+            create_appointment(
+                service, schedule=schedule + datetime.timedelta(hours=hours)
+            )
+            for hours in range(3)
+        ]
+        # the first exported row has no review
+        Review.objects.create(appointment=self.appointments[2], rating=4)
+
+    def export(self, query):
+        request = APIRequestFactory().get(f"/?{query}")
+        force_authenticate(request, user=self.user)
+        response = AppointmentView.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_columns_come_from_the_serializer(self):
+        content = self.export(
+            "export=csv&order_by=id&fields=id,review.id,review.rating"
+        )
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ["id", "review.id", "review.rating"])
+        review = self.appointments[2].review
+        self.assertEqual(
+            rows[1:],
+            [
+                [str(self.appointments[0].pk), "", ""],
+                [str(self.appointments[1].pk), "", ""],
+                [str(self.appointments[2].pk), str(review.pk), "4"],
+            ],
+        )
+
+
+class QueryCountTest(QueryCountMixin, TestCase):
+    def setUp(self):
+        image = File.objects.create(name="image", url="https://example.com/image.png")
+        label = Label.objects.create(name="Fade")
+        schedule = timezone.now().replace(second=0, microsecond=0)
+        for index in range(6):
+            service = create_service()
+            ServiceImage.objects.create(service=service, image=image)
+            ServiceLabel.objects.create(service=service, label=label)
+            appointment = create_appointment(
+                service, schedule=schedule + datetime.timedelta(hours=index)
+            )
+            review = Review.objects.create(appointment=appointment, rating=5)
+            ReviewImage.objects.create(review=review, image=image)
+            ReviewImage.objects.create(review=review, image=image)
+        self.user = service.specialist.user
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        for view in (
+            AppointmentView,
+            ReviewView,
+            ServiceView,
+            ServiceImageView,
+            ServiceLabelView,
+        ):
+            self.assertFlatQueries(view, self.user)
+        self.assertFlatQueries(AppointmentView, self.user, "fields=id,service")
+
+
+class LocalCacheTest(TestCase):
+    """
+    Writes made by another process only reach this one through the shared cache
+    (the in-memory channel layer broadcasts nothing): they must show at once
+    """
+
+    def setUp(self):
+        cache.clear()
+        process_cache.clear()
+        self.label = Label.objects.create(name="Fade")
+        self.user = create_customer().user
+
+    def read(self, **kwargs):
+        actions = {"get": "retrieve" if kwargs else "list"}
+        return call_view(LabelView, actions, self.user, **kwargs).content
+
+    def test_list_follows_the_shared_generation(self):
+        self.assertIn(b"Fade", self.read())
+        # another process renames the label and bumps the generation
+        Label.objects.filter(pk=self.label.pk).update(name="Taper")
+        bump_generation(LabelView.get_list_generation_key())
+        self.assertIn(b"Taper", self.read())
+
+    def test_global_objects_skip_the_local_tier_without_broadcasts(self):
+        self.assertIn(b"Fade", self.read(pk=self.label.pk))
+        # another process renames the label and deletes its shared entry
+        Label.objects.filter(pk=self.label.pk).update(name="Taper")
+        cache.delete(LabelView().get_object_cache_key(self.label.pk))
+        self.assertIn(b"Taper", self.read(pk=self.label.pk))
+
+
+class RebuildLockTest(TestCase):
+    """
+    Requests missing an entry that another request is rebuilding never sleep on its lock
+    """
+
+    def setUp(self):
+        cache.clear()
+        process_cache.clear()
+        self.service = create_service(name="Fade")
+        self.user = self.service.specialist.user
+
+    def list(self):
+        return call_view(ServiceView, {"get": "list"}, self.user)
+
+    def rename(self):
+        # a write elsewhere moves the list to a new generation
+        Service.objects.filter(pk=self.service.pk).update(name="Taper")
+        bump_generation(ServiceView.get_list_generation_key())
+
+    def locked(self):
+        # another request holds every rebuild lock
+        add = cache.add
+        return mock.patch.object(
+            cache,
+            "add",
+            lambda key, *args, **kwargs: (
+                False if key.endswith("_lock") else add(key, *args, **kwargs)
+            ),
+        )
+
+    def test_stale_copy_is_served_while_locked(self):
+        self.list()
+        self.rename()
+        with self.locked():
+            response = self.list()
+        self.assertIn(b"Fade", response.content)
+        fresh = self.list()
+        self.assertIn(b"Taper", fresh.content)
+        # the validators of the new generation do not describe the stale copy
+        self.assertNotEqual(response["ETag"], fresh["ETag"])
+        self.assertNotIn("Last-Modified", response)
+
+    def test_rebuilds_without_waiting_when_there_is_no_stale_copy(self):
+        self.list()
+        self.rename()
+        cache.clear()
+        process_cache.clear()
+        with self.locked(), mock.patch("time.sleep") as sleep:
+            response = self.list()
+        sleep.assert_not_called()
+        self.assertIn(b"Taper", response.content)
+        self.assertIn("Last-Modified", response)
+
+
+class CounterTest(TestCase):
+    """
+    The stored review counters of services, specialists and barbers follow every review
+    write, and the rating sum backing them stays out of the API
+    """
+
+    def setUp(self):
+        shop = BarberShop.objects.create(name="Shop")
+        specialist = create_specialist(barber_shop=shop)
+        self.barbers = [
+            Barber.objects.create(barber_shop=shop, name=name) for name in ("A", "B")
+        ]
+        self.services = [create_service(specialist), create_service(specialist)]
+        start = timezone.now().replace(second=0, microsecond=0)
+        self.appointments = [
+            create_appointment(
+                service,
+                barber=barber,
+                schedule=start + datetime.timedelta(days=index + 2),
+            )
+            for index, (service, barber) in enumerate(zip(self.services, self.barbers))
+        ]
+
+    def assertCounters(self, *expected):
+        """`expected`: (rating sum, count, average) of each service, then each barber"""
+        rows = self.services + self.barbers
+        for row in rows:
+            row.refresh_from_db()
+        self.assertEqual(
+            [
+                (
+                    row.rating_sum,
+                    getattr(row, "total_reviews", getattr(row, "reviews_count", None)),
+                    row.average_rating,
+                )
+                for row in rows
+            ],
+            list(expected) * 2,
+        )
+        specialist = self.services[0].specialist
+        specialist.refresh_from_db()
+        total = sum(rating for rating, _, _ in expected)
+        count = sum(reviews for _, reviews, _ in expected)
+        self.assertEqual(
+            (specialist.rating_sum, specialist.reviews_count),
+            (total, count),
+        )
+        # nothing drifted from what the reviews say
+        self.assertFalse(any(rebuild_counters().values()))
+
+    def test_counters_follow_review_writes(self):
+        review = Review.objects.create(appointment=self.appointments[0], rating=4)
+        self.assertCounters((4, 1, 4.0), (0, 0, 0.0))
+        Review.objects.create(appointment=self.appointments[1], rating=2)
+        self.assertCounters((4, 1, 4.0), (2, 1, 2.0))
+
+        review.rating = 5
+        review.save()
+        self.assertCounters((5, 1, 5.0), (2, 1, 2.0))
+
+        review.delete()
+        self.assertCounters((0, 0, 0.0), (2, 1, 2.0))
+
+    def test_counters_follow_a_moved_review(self):
+        review = Review.objects.create(appointment=self.appointments[0], rating=4)
+        review.appointment = self.appointments[1]
+        review.rating = 3
+        review.save()
+        self.assertCounters((0, 0, 0.0), (3, 1, 3.0))
+
+    def test_rating_sum_stays_out_of_the_api(self):
+        for view in (ServiceView, SpecialistView):
+            response = call_view(
+                view, {"get": "list"}, self.services[0].specialist.user
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn(b"rating_sum", response.content)
+        # appointments embed their service and its specialist
+        response = call_view(
+            AppointmentView,
+            {"get": "list"},
+            self.services[0].specialist.user,
+            "export=csv",
+        )
+        self.assertNotIn(b"rating_sum", b"".join(response.streaming_content))
+
+
+class PaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        process_cache.clear()
+        self.service = create_service()
+        self.user = self.service.specialist.user
+        start = timezone.now().replace(second=0, microsecond=0)
+        self.appointments = [
+            create_appointment(
+                self.service, schedule=start + datetime.timedelta(days=2, hours=index)
+            )
+            for index in range(AppointmentView.size_per_request + 5)
+        ]
+
+    def list(self, query, status_code=200):
+        response = call_view(AppointmentView, {"get": "list"}, self.user, query)
+        self.assertEqual(response.status_code, status_code)
+        return json.loads(response.content)
+
+    def ids(self, page):
+        return [appointment["id"] for appointment in page["objects"]]
+
+    def test_cursor_pages_walk_every_object_once(self):
+        pages = [self.list("cursor=")]
+        while pages[-1]["next"]:
+            pages.append(self.list(f"cursor={quote(pages[-1]['next'])}"))
+        seen = [pk for page in pages for pk in self.ids(page)]
+        self.assertEqual(len(pages), 2)
+        self.assertCountEqual(
+            seen, [appointment.pk for appointment in self.appointments]
+        )
+        # the previous page of the second one is the first
+        previous = self.list(f"cursor={quote(pages[1]['prev'])}")
+        self.assertEqual(self.ids(previous), self.ids(pages[0]))
+
+    def test_invalid_cursor(self):
+        self.list("cursor=nonsense", status_code=400)
+
+    def test_cached_count_follows_writes(self):
+        total = len(self.appointments)
+        self.assertEqual(self.list("top=0&bottom=5")["total_count"], total)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_appointment(
+                self.service,
+                schedule=self.appointments[-1].schedule + datetime.timedelta(days=1),
+            )
+        self.assertEqual(self.list("top=0&bottom=5")["total_count"], total + 1)
+
+    def test_lists_without_count(self):
+        size = AppointmentView.size_per_request
+        page = self.list(f"count=none&top=0&bottom={size}")
+        self.assertNotIn("total_count", page)
+        self.assertTrue(page["has_more"])
+        self.assertEqual(page["current_page"], 1)
+        page = self.list(f"count=none&top={size}&bottom={size * 2}")
+        self.assertFalse(page["has_more"])
+        self.assertEqual(len(page["objects"]), 5)
+
+
+class ConditionalRequestTest(TestCase):
+    """ETag and Last-Modified of ServiceView move with the data they describe"""
+
+    def setUp(self):
+        cache.clear()
+        process_cache.clear()
+        self.service = create_service()
+        self.user = self.service.specialist.user
+
+    def request(self, headers=None, **kwargs):
+        actions = {"get": "retrieve" if kwargs else "list"}
+        return call_view(ServiceView, actions, self.user, headers=headers, **kwargs)
+
+    def test_list_etag(self):
+        etag = self.request()["ETag"]
+        self.assertEqual(self.request({"If-None-Match": etag}).status_code, 304)
+        # nested objects are covered through the cache dependencies
+        with self.captureOnCommitCallbacks(execute=True):
+            ServiceImage.objects.create(
+                service=self.service,
+                image=File.objects.create(
+                    name="cut", url="https://example.com/cut.png"
+                ),
+            )
+        response = self.request({"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn(b"cut.png", response.content)
+
+    def test_object_last_modified(self):
+        response = self.request(pk=self.service.pk)
+        headers = {"If-Modified-Since": response["Last-Modified"]}
+        self.assertEqual(self.request(headers, pk=self.service.pk).status_code, 304)
+        # Last-Modified has a one second resolution
+        clock = mock.Mock(time=mock.Mock(return_value=time.time() + 2))
+        with mock.patch("haircat.utils.caching.time", clock):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.first_name = "Renamed"
+                self.user.save()
+        response = self.request(headers, pk=self.service.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Renamed", response.content)
+
+
+class CacheDependencyTest(TestCase):
+    """Cached lists follow writes to the rows they embed"""
+
+    def setUp(self):
+        cache.clear()
+        process_cache.clear()
+        self.service = create_service(name="Fade")
+        self.user = self.service.specialist.user
+
+    def list(self, view):
+        return call_view(view, {"get": "list"}, self.user).content
+
+    def test_nested_serializer_rows(self):
+        create_appointment(self.service)
+        self.assertIn(b"Fade", self.list(AppointmentView))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.name = "Taper"
+            self.service.save()
+        self.assertIn(b"Taper", self.list(AppointmentView))
+
+    def test_declared_dependencies(self):
+        label = Label.objects.create(name="Short")
+        self.assertIn(b'"total_services":0', self.list(LabelView))
+        # total_services reads ServiceLabels, which LabelView does not serialize
+        with self.captureOnCommitCallbacks(execute=True):
+            ServiceLabel.objects.create(service=self.service, label=label)
+        self.assertIn(b'"total_services":1', self.list(LabelView))
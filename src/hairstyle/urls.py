@@ -30,6 +30,13 @@ urlpatterns = [
         ServiceLabelView.as_view({"get": "list", "post": "create"}),
         name="service-label-list",
     ),
+    path(
+        "service-labels/bulk/",
+        ServiceLabelView.as_view(
+            {"post": "bulk_create", "put": "bulk_update", "delete": "bulk_destroy"}
+        ),
+        name="service-label-bulk",
+    ),
     path(
         "service-labels/<int:pk>/",
         ServiceLabelView.as_view({"delete": "destroy"}),
@@ -40,6 +47,13 @@ urlpatterns = [
         ServiceImageView.as_view({"get": "list", "post": "create"}),
         name="service-image-list",
     ),
+    path(
+        "service-images/bulk/",
+        ServiceImageView.as_view(
+            {"post": "bulk_create", "put": "bulk_update", "delete": "bulk_destroy"}
+        ),
+        name="service-image-bulk",
+    ),
     path(
         "service-images/<int:pk>/",
         ServiceImageView.as_view({"delete": "destroy"}),
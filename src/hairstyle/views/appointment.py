@@ -7,6 +7,7 @@ from hairstyle.serializers.appointment_message import (
     AppointmentMessageThreadSerializer,
     AppointmentMessageSerializer,
 )
+from account.models import Customer
 from hairstyle.models.appointment import (
     Appointment,
     Review,
@@ -22,8 +23,6 @@ from rest_framework import status
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
 from rest_framework.exceptions import ValidationError
-from django.core.cache import cache
-from django.core.paginator import Paginator
 from django.db.models import Q
 
 from general.webhooks import send_webhook
@@ -32,11 +31,59 @@ from general.webhooks import send_webhook
 class AppointmentView(GenericView):
     serializer_class = AppointmentSerializer
     queryset = Appointment.objects.all()
+    allowed_methods = GenericView.allowed_methods + ["export"]
+    cursor_pagination = True
+    fast_read = True
+    count_strategy = GenericView.COUNT_CACHED
+    cache_key_prefix = "appointment"
+    cache_duration = 60 * 60 * 24  # invalidated through cache dependencies
+    stale_while_revalidate = 60
+    # has_active_appointment turns false when an appointment starts, without a write
+    cache_period = 60 * 5
+    cache_gzip_min_size = 1024
+    # `specialist` and the user role flags are model properties
+    select_related_fields = {
+        "customer": ["customer__user__specialist__barber_shop"],
+        "specialist": [
+            "service__specialist__user__pfp",
+            "service__specialist__user__location",
+            "service__specialist__user__customer",
+            "service__specialist__barber_shop",
+        ],
+        "service": ["service__specialist"],  # read by `specialist_location`
+    }
+    # read by the customers' total_points and has_active_appointment
+    cache_dependencies = [
+        "customer__reward_points",
+        "customer__Appointments",
+        "service__specialist__user__customer__reward_points",
+        "service__specialist__user__customer__Appointments",
+    ]
+    annotations = {
+        "customer.total_points": Customer.total_points_annotation(),
+        "customer.has_active_appointment": Customer.has_active_appointment_annotation,
+    }
 
 
 class ReviewView(GenericView):
     serializer_class = ReviewSerializer
     queryset = Review.objects.all()
+    # the nested appointment reads the same properties as in AppointmentView,
+    # `images` is a model property over the reverse relation
+    select_related_fields = {
+        "appointment": [
+            "appointment__customer__user__specialist__barber_shop",
+            "appointment__service__specialist__user__pfp",
+            "appointment__service__specialist__user__location",
+            "appointment__service__specialist__user__customer",
+            "appointment__service__specialist__barber_shop",
+        ],
+    }
+    prefetch_related_fields = {"images": ["Images__image"]}
+    annotations = {
+        "appointment.customer.total_points": Customer.total_points_annotation(),
+        "appointment.customer.has_active_appointment": Customer.has_active_appointment_annotation,
+    }
 
 
 class ReviewImageView(GenericView):
@@ -50,9 +97,26 @@ class AppointmentMessageThreadView(GenericView):
     queryset = AppointmentMessageThread.objects.all()
     allowed_methods = ["list", "create", "retrieve"]
     permission_classes = [IsAuthenticated]
+    cache_key_prefix = "appointment_message_thread"
+    cache_duration = 60 * 60 * 24
+    cache_scope = GenericView.SCOPE_USER
+    cache_scope_users = [
+        "appointment.customer.user_id",
+        "appointment.service.specialist.user_id",
+    ]
+    # read by the last message, title and picture method fields
+    cache_dependencies = [
+        "Messages__sender",
+        "appointment__service",
+        "appointment__customer__user__pfp",
+        "appointment__service__specialist__user__pfp",
+    ]
 
     def initialize_queryset(self):
-        self.queryset = self.queryset.filter(Q(appointment__customer__user=self.request.user) | Q(appointment__service__specialist__user=self.request.user))
+        self.queryset = self.queryset.filter(
+            Q(appointment__customer__user=self.request.user)
+            | Q(appointment__service__specialist__user=self.request.user)
+        )
         self.serializer_context = {"request": self.request}
 
     def filter(self, request, filters, excludes, top, bottom, order_by=None):
@@ -65,46 +129,14 @@ class AppointmentMessageThreadView(GenericView):
             .order_by("-latest_message_created_at")
         )
 
-        queryset = self.filter_queryset(filters, excludes)
-
-        if order_by:
-            queryset = queryset.order_by(order_by)
-
-        paginator = Paginator(queryset, self.size_per_request)
-        page_number = (top // self.size_per_request) + 1
-        page = None
-        if bottom is None:
-            page = paginator.get_page(page_number)
-        else:
-            page = queryset[top:bottom]
-
-        serializer = self.serializer_class(
-            page, many=True, context=self.serializer_context
-        )
-        data = None
-        if bottom is None:
-            data = {
-                "objects": serializer.data,
-                "total_count": paginator.count,
-                "num_pages": paginator.num_pages,
-                "current_page": page.number,
-            }
-        else:
-            data = {
-                "objects": serializer.data,
-                "total_count": queryset.count(),
-            }
-
-        cache_key = self.get_list_cache_key(filters, excludes, top, bottom, order_by)
-        cache.set(cache_key, data, self.cache_duration)
-
-        return Response(data, status=status.HTTP_200_OK)
+        return super().filter(request, filters, excludes, top, bottom, order_by)
 
 
 class AppointmentMessageView(GenericView):
     serializer_class = AppointmentMessageSerializer
     queryset = AppointmentMessage.objects.all().order_by("-created_at")
     allowed_methods = ["list", "create"]
+    cursor_pagination = True
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=["post"])
@@ -116,7 +148,7 @@ class AppointmentMessageView(GenericView):
 
         try:
             thread = AppointmentMessageThread.objects.get(id=thread_id)
-            thread.mark_unread_messages(request.user)
+            self.mark_thread_read(thread, request.user)
         except AppointmentMessageThread.DoesNotExist:
             return Response(
                 {"error": "Thread not found"}, status=status.HTTP_404_NOT_FOUND
@@ -131,20 +163,21 @@ class AppointmentMessageView(GenericView):
         request._full_data = mutable_data
 
         return self.create(request)
-    
+
     def post_create(self, request, instance):
         # Get thread and serialize instance directly
         thread = instance.appointment_message_thread
-        serialized_data = self.serializer_class(instance, context=self.serializer_context).data
-        
+        serialized_data = self.serializer_class(
+            instance, context=self.serializer_context
+        ).data
+
         # Get recipient IDs more efficiently
 
         recipient_ids = [
             thread.appointment.customer.user.id,
-            thread.appointment.service.specialist.user.id
+            thread.appointment.service.specialist.user.id,
         ]
 
-        
         # Send webhooks to all recipients
         for recipient_id in recipient_ids:
             send_webhook(
@@ -157,6 +190,12 @@ class AppointmentMessageView(GenericView):
                 },
             )
 
+    def mark_thread_read(self, thread, user):
+        if thread.mark_unread_messages(user):
+            # unread counts in the user's thread list changed
+            AppointmentMessageThreadView.invalidate_cache_scopes(
+                [GenericView.get_user_scope(user.pk)]
+            )
 
     @action(detail=False, methods=["get"])
     def list(self, request, thread_id=None):
@@ -169,7 +208,7 @@ class AppointmentMessageView(GenericView):
             )
 
         thread = get_object_or_404(AppointmentMessageThread, id=thread_id)
-        thread.mark_unread_messages(request.user)
+        self.mark_thread_read(thread, request.user)
         self.queryset = self.queryset.filter(appointment_message_thread=thread)
         try:
             filters, excludes = self.parse_query_params(request)
@@ -180,9 +219,9 @@ class AppointmentMessageView(GenericView):
                 cache_key = self.get_list_cache_key(
                     filters, excludes, top, bottom, order_by
                 )
-                cached_data = cache.get(cache_key)
+                cached_data = self.get_cached(cache_key)
             if cached_data:
-                return Response(cached_data, status=status.HTTP_200_OK)
+                return self.cached_response(cached_data)
 
             return self.filter(request, filters, excludes, top, bottom, order_by)
         except ValidationError as e:
@@ -15,20 +15,65 @@ class ServiceView(GenericView):
     serializer_class = ServiceSerializer
     queryset = Service.objects.all()
     permission_classes = [IsAuthenticated]
+    conditional_requests = True
+    cache_key_prefix = "service"
+    cache_duration = 60 * 60 * 24  # invalidated through cache dependencies
+    stale_while_revalidate = 60
+    local_cache_duration = 5
+    # has_active_appointment of the specialist's customer profile turns false
+    # when an appointment starts, without a write
+    cache_period = 60 * 5
+    cache_gzip_min_size = 1024
+    # `images` and `labels` are model properties over the reverse relations
+    select_related_fields = {
+        "specialist": ["specialist__user__pfp", "specialist__user__customer"],
+    }
+    prefetch_related_fields = {
+        "images": ["ServiceImages__image"],
+        "labels": ["ServiceLabels__label"],
+    }
+    # read by labels.label.total_services and the specialist's customer profile
+    cache_dependencies = [
+        "ServiceLabels__label__ServiceLabels",
+        "specialist__user__customer__reward_points",
+        "specialist__user__customer__Appointments",
+    ]
+    annotations = {"labels.label.total_services": Label.total_services_annotation()}
 
 
 class ServiceLabelView(GenericView):
     serializer_class = ServiceLabelSerializer
     queryset = ServiceLabel.objects.all()
-    allowed_methods = ["list", "retrieve", "create", "delete"]
+    allowed_methods = [
+        "list",
+        "retrieve",
+        "create",
+        "delete",
+        "bulk_create",
+        "bulk_delete",
+    ]
     permission_classes = [IsAuthenticated]
+    select_related_fields = {
+        "service": ["service__specialist"]
+    }  # `specialist_location`
+    annotations = {"label.total_services": Label.total_services_annotation()}
 
 
 class ServiceImageView(GenericView):
     serializer_class = ServiceImageSerializer
     queryset = ServiceImage.objects.all()
-    allowed_methods = ["list", "retrieve", "create", "delete"]
+    allowed_methods = [
+        "list",
+        "retrieve",
+        "create",
+        "delete",
+        "bulk_create",
+        "bulk_delete",
+    ]
     permission_classes = [IsAuthenticated]
+    select_related_fields = {
+        "service": ["service__specialist"]
+    }  # `specialist_location`
 
 
 class LabelView(GenericView):
@@ -36,3 +81,9 @@ class LabelView(GenericView):
     queryset = Label.objects.all()
     allowed_methods = ["list", "retrieve", "create", "delete"]
     permission_classes = [IsAuthenticated]
+    cache_key_prefix = "label"
+    cache_duration = 60 * 60 * 24
+    stale_while_revalidate = 60
+    local_cache_duration = 5
+    cache_dependencies = ["ServiceLabels"]  # read by total_services
+    annotations = {"total_services": Label.total_services_annotation()}